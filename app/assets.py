@@ -0,0 +1,198 @@
+"""
+内容寻址的图片资源存储。
+
+图表/插图按内容 sha256 写入 app/static/images/<hash>.<ext>，同一张图只存一份；
+charts_data 中只保存引用 {"type": "image", "format", "hash", "url"}，
+由 routes/utils.py::get_chart_image 以强 ETag + 长缓存对外提供。
+
+用法（迁移存量 base64 图表）：
+    python -m app.assets --migrate
+"""
+import argparse
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "images")
+CHART_URL_PREFIX = "/api/v1/chart/"
+PREGENERATE_VARIANTS = os.getenv("CHART_VARIANTS", "1").strip().lower() in ("1", "true", "yes", "on")
+
+MIME_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "gif": "image/gif",
+    "svg": "image/svg+xml",
+    "webp": "image/webp",
+}
+_EXT_BY_MIME = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/gif": "gif",
+    "image/svg+xml": "svg",
+    "image/webp": "webp",
+}
+
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+_DATA_URI_RE = re.compile(r"^data:([\w/+.-]+);base64,(.*)$", re.DOTALL)
+_PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def ext_for_mime(mime: str) -> Optional[str]:
+    return _EXT_BY_MIME.get((mime or "").lower())
+
+
+def is_asset_hash(value: str) -> bool:
+    return bool(_HASH_RE.match(value or ""))
+
+
+def asset_path(digest: str, ext: str) -> str:
+    return os.path.join(IMAGES_DIR, f"{digest}.{ext}")
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """先写临时文件再原子替换，避免并发写入时读到半截文件"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def store_bytes(data: bytes, ext: str = "png") -> str:
+    """写入资源并返回其 sha256；内容已存在时不重复写入。
+    新写入的位图同时预生成 WebP/多宽度变体（见 app.image_variants，CHART_VARIANTS=0 关闭）。"""
+    digest = hashlib.sha256(data).hexdigest()
+    path = asset_path(digest, ext)
+    if not os.path.exists(path):
+        write_atomic(path, data)
+        if PREGENERATE_VARIANTS:
+            from app import image_variants
+
+            # 变体只是优化：无法解码的图片照常保存原图
+            try:
+                image_variants.ensure_variants(digest, ext)
+            except image_variants.VARIANT_ERRORS as e:
+                logger.warning("cannot generate variants for %s.%s: %s", digest, ext, e)
+    return digest
+
+
+def chart_ref(digest: str, fmt: str = "png") -> Dict[str, Any]:
+    """charts_data 中单个图表的引用结构。"""
+    return {
+        "type": "image",
+        "format": fmt,
+        "hash": digest,
+        "url": f"{CHART_URL_PREFIX}{digest}",
+    }
+
+
+def store_chart(data: bytes, fmt: str = "png") -> Dict[str, Any]:
+    return chart_ref(store_bytes(data, fmt), fmt)
+
+
+def find_asset(digest: str) -> Optional[Tuple[str, str]]:
+    """按 hash 查找资源文件，返回 (path, media_type)。"""
+    if not is_asset_hash(digest):
+        return None
+    for ext, mime in MIME_TYPES.items():
+        path = asset_path(digest, ext)
+        if os.path.exists(path):
+            return path, mime
+    return None
+
+
+# ---------------- 存量数据迁移 ----------------
+
+def _decode_inline_image(value: str) -> Optional[Tuple[bytes, str]]:
+    """识别 data URI 或生成器产出的裸 base64 PNG，返回 (bytes, ext)。"""
+    m = _DATA_URI_RE.match(value)
+    if m:
+        ext = _EXT_BY_MIME.get(m.group(1).lower())
+        if not ext:
+            return None
+        try:
+            return base64.b64decode(m.group(2)), ext
+        except (binascii.Error, ValueError):
+            return None
+    if len(value) < 64 or value.startswith(("http://", "https://", "//", "/")):
+        return None
+    try:
+        data = base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    if data.startswith(_PNG_MAGIC):
+        return data, "png"
+    return None
+
+
+def externalize_charts(charts: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """把 charts_data 中内联的 base64 图片落盘并替换为引用，返回 (新 charts_data, 是否有变化)。"""
+    if not isinstance(charts, dict):
+        return charts, False
+    changed = False
+    result: Dict[str, Any] = {}
+    for key, value in charts.items():
+        inline = None
+        if isinstance(value, str):
+            inline = _decode_inline_image(value)
+        elif isinstance(value, dict) and isinstance(value.get("data"), str):
+            # 旧版 {"type": "matplotlib", "data": <base64>, "title": ...}
+            inline = _decode_inline_image(value["data"])
+        if inline:
+            data, ext = inline
+            result[key] = store_chart(data, ext)
+            changed = True
+        else:
+            result[key] = value
+    return result, changed
+
+
+def migrate_content_charts(db) -> int:
+    """遍历 content 表，将内联图片迁移到资源存储，返回更新的行数。"""
+    from app import models
+
+    updated = 0
+    for item in db.query(models.Content).yield_per(50):
+        charts, changed = externalize_charts(item.charts_data)
+        if changed:
+            item.charts_data = charts
+            updated += 1
+    if updated:
+        db.commit()
+    return updated
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Content-addressed chart/image asset store")
+    parser.add_argument("--migrate", action="store_true", help="Move inline base64 charts in the content table to the asset store")
+    args = parser.parse_args(argv)
+    if not args.migrate:
+        parser.error("Please provide --migrate")
+
+    from app.database import SessionLocal, ensure_schema
+
+    ensure_schema()
+    db = SessionLocal()
+    try:
+        updated = migrate_content_charts(db)
+        print({"updated": updated, "images_dir": IMAGES_DIR})
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
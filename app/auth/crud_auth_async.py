@@ -0,0 +1,14 @@
+from typing import Optional, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models_auth
+
+# crud_auth.py 中只读接口使用的查询的异步版本；写操作仍走同步 crud_auth
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[models_auth.User]:
+    return await db.get(models_auth.User, user_id)
+
+
+async def list_favorites(db: AsyncSession, user_id: int) -> List[models_auth.Favorite]:
+    return (await db.scalars(select(models_auth.Favorite).where(models_auth.Favorite.user_id == user_id))).all()
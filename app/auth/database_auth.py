@@ -1,18 +1,20 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 
+from app.db_engine import make_engine, make_async_engine
+
 # 独立权限库，默认sqlite文件 auth_module.db（可通过环境变量 AUTH_DATABASE_URL 覆盖）
 AUTH_DATABASE_URL = os.getenv("AUTH_DATABASE_URL", "sqlite:///./auth_module.db")
 
-engine_auth = create_engine(
-    AUTH_DATABASE_URL,
-    connect_args={"check_same_thread": False} if AUTH_DATABASE_URL.startswith("sqlite") else {},
-    echo=True,
-)
+engine_auth = make_engine(AUTH_DATABASE_URL)
 
 SessionLocalAuth = sessionmaker(autocommit=False, autoflush=False, bind=engine_auth)
 
+async_engine_auth = make_async_engine(AUTH_DATABASE_URL)
+AsyncSessionLocalAuth = async_sessionmaker(async_engine_auth, autoflush=False, expire_on_commit=False)
+
 BaseAuth = declarative_base()
 
 
@@ -24,6 +26,11 @@ def get_db_auth():
         db.close()
 
 
+async def get_async_db_auth():
+    async with AsyncSessionLocalAuth() as db:
+        yield db
+
+
 def ensure_auth_schema():
     """在 SQLite 下以低侵入方式为 users 表添加新列，用于后续扩展。"""
     if not AUTH_DATABASE_URL.startswith("sqlite"):
@@ -1,17 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
-from .database_auth import get_db_auth, BaseAuth, engine_auth, ensure_auth_schema
-from . import crud_auth, schemas_auth, models_auth
+from .database_auth import get_db_auth, get_async_db_auth, BaseAuth, engine_auth, ensure_auth_schema
+from . import crud_auth, crud_auth_async, schemas_auth, models_auth
 from .security import create_access_token, create_refresh_token, decode_token
 
 # 新增导入
 from datetime import datetime, timedelta
 import secrets
-from app.database import get_db
-from app import models as main_models
+from app.database import get_async_db
+from app import crud_async
 
 # 确保权限库表创建并做低侵入扩展
 BaseAuth.metadata.create_all(bind=engine_auth)
@@ -57,12 +58,12 @@ def refresh(req: schemas_auth.RefreshRequest, db: Session = Depends(get_db_auth)
 
 
 @router.get("/me", response_model=schemas_auth.UserOut)
-def me(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db_auth)):
+async def me(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db_auth)):
     payload = decode_token(token)
     if not payload or payload.get("type") != "access":
         raise HTTPException(status_code=401, detail="无效或过期的令牌")
     user_id = int(payload.get("sub", 0))
-    user = db.query(models_auth.User).get(user_id)
+    user = await crud_auth_async.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
     return user
@@ -70,12 +71,12 @@ def me(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db_auth)):
 
 # Profile
 @router.get("/profile", response_model=schemas_auth.UserOut)
-def get_profile(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db_auth)):
+async def get_profile(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db_auth)):
     payload = decode_token(token)
     if not payload or payload.get("type") != "access":
         raise HTTPException(status_code=401, detail="无效或过期的令牌")
     user_id = int(payload.get("sub", 0))
-    user = db.query(models_auth.User).get(user_id)
+    user = await crud_auth_async.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
     return user
@@ -151,25 +152,23 @@ def add_favorite(req: schemas_auth.FavoriteCreate, token: str = Depends(oauth2_s
 
 
 @router.get("/favorites", response_model=List[schemas_auth.FavoriteOut])
-def list_favorites(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db_auth)):
+async def list_favorites(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db_auth)):
     payload = decode_token(token)
     if not payload or payload.get("type") != "access":
         raise HTTPException(status_code=401, detail="无效或过期的令牌")
     user_id = int(payload.get("sub", 0))
-    return crud_auth.list_favorites(db, user_id=user_id)
+    return await crud_auth_async.list_favorites(db, user_id=user_id)
 
 
 @router.get("/favorites/with-content", response_model=List[schemas_auth.FavoriteWithContent])
-def list_favorites_with_content(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db_auth), main_db: Session = Depends(get_db)):
+async def list_favorites_with_content(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db_auth), main_db: AsyncSession = Depends(get_async_db)):
     payload = decode_token(token)
     if not payload or payload.get("type") != "access":
         raise HTTPException(status_code=401, detail="无效或过期的令牌")
     user_id = int(payload.get("sub", 0))
-    favs = crud_auth.list_favorites(db, user_id=user_id)
+    favs = await crud_auth_async.list_favorites(db, user_id=user_id)
     content_ids = [f.content_id for f in favs]
-    contents = []
-    if content_ids:
-        contents = main_db.query(main_models.Content).filter(main_models.Content.id.in_(content_ids)).all()
+    contents = await crud_async.get_contents_by_ids(main_db, content_ids)
     content_map = {c.id: c for c in contents}
     result: List[schemas_auth.FavoriteWithContent] = []
     for f in favs:
@@ -0,0 +1,65 @@
+"""
+API 冷启动基准：在全新子进程中多次导入 app.main，统计导入耗时，
+并检查科学计算栈（matplotlib/sklearn/sympy 等）是否被提前加载。
+
+用法：
+    python -m app.bench_startup
+    python -m app.bench_startup --runs 10 --max-seconds 1.0   # 超过阈值或加载了重依赖时返回非零
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+# 只读接口不应触发导入的模块
+HEAVY_MODULES = ("matplotlib", "seaborn", "sympy", "sklearn", "scipy", "pandas")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+sys.__stdout__.write("\\n" + json.dumps({{"seconds": elapsed, "heavy": heavy}}) + "\\n")
+"""
+
+
+def measure_once(module: str = "app.main") -> Dict[str, Any]:
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    # 导入过程中可能有日志输出，结果取最后一行
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run(runs: int = 5, module: str = "app.main") -> Dict[str, Any]:
+    samples: List[Dict[str, Any]] = [measure_once(module) for _ in range(runs)]
+    seconds = [s["seconds"] for s in samples]
+    return {
+        "module": module,
+        "runs": runs,
+        "min": round(min(seconds), 3),
+        "median": round(statistics.median(seconds), 3),
+        "max": round(max(seconds), 3),
+        "heavy_modules": sorted({m for s in samples for m in s["heavy"]}),
+    }
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Measure API cold-start import time")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreter runs")
+    parser.add_argument("--module", default="app.main", help="Module to import")
+    parser.add_argument("--max-seconds", type=float, default=None, help="Fail if the median import time exceeds this")
+    args = parser.parse_args(argv)
+
+    report = run(args.runs, args.module)
+    print(report)
+    if report["heavy_modules"]:
+        sys.exit(f"heavy modules imported at startup: {', '.join(report['heavy_modules'])}")
+    if args.max_seconds is not None and report["median"] > args.max_seconds:
+        sys.exit(f"median import time {report['median']}s exceeds {args.max_seconds}s")
+
+
+if __name__ == "__main__":
+    main()
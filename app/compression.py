@@ -0,0 +1,208 @@
+"""
+响应压缩中间件（gzip / brotli，按 Accept-Encoding 协商）。
+
+- 小于 minimum_size 的响应、图片等已压缩格式、已带 Content-Encoding 的响应
+  （如详情接口直接返回的预压缩 gzip）原样发送。
+- 带 ETag 的完整响应，其压缩结果按 (ETag, 编码) 缓存在进程内，
+  相同内容的后续请求不再重复压缩。
+- 流式响应（分块发送）使用增量压缩。
+- brotli 为可选依赖，未安装时只提供 gzip。
+"""
+import gzip
+import io
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 可选依赖
+    brotli = None
+
+DEFAULT_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+DEFAULT_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+DEFAULT_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+DEFAULT_CACHE_ENTRIES = int(os.getenv("COMPRESSION_CACHE_ENTRIES", "256"))
+
+_COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str, encodings: Optional[Tuple[str, ...]] = None) -> Optional[str]:
+    """按 q 值在 encodings（默认全部支持的编码）中选择，q 相同时靠前者优先（br）；都不接受时返回 None"""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for encoding in encodings or supported_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return any(content_type.startswith(t) for t in _COMPRESSIBLE_TYPES)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+            self._gz = None
+        else:
+            self._br = None
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self._br is not None:
+            return self._br.process(data)
+        return self._gz.compress(data)
+
+    def flush(self) -> bytes:
+        if self._br is not None:
+            return self._br.finish()
+        return self._gz.flush()
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = DEFAULT_MINIMUM_SIZE,
+        gzip_level: int = DEFAULT_GZIP_LEVEL,
+        brotli_quality: int = DEFAULT_BROTLI_QUALITY,
+        cache_entries: int = DEFAULT_CACHE_ENTRIES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_entries = cache_entries
+        self._cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_quality)
+        buf = io.BytesIO()
+        with gzip.GzipFile(fileobj=buf, mode="wb", compresslevel=self.gzip_level, mtime=0) as f:
+            f.write(data)
+        return buf.getvalue()
+
+    def compress_cached(self, data: bytes, encoding: str, etag: Optional[str]) -> bytes:
+        if not etag or self.cache_entries <= 0:
+            return self.compress(data, encoding)
+        key = (etag, encoding)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+        compressed = self.compress(data, encoding)
+        with self._lock:
+            self._cache[key] = compressed
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return compressed
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.compressor: Optional[_StreamCompressor] = None
+
+    def _eligible(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if message["status"] < 200 or message["status"] in (204, 206, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        return is_compressible(headers.get("content-type", ""))
+
+    def _encoded_start(self, length: Optional[int]) -> Message:
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(length)
+        return {**self.start, "headers": headers.raw}
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.passthrough = not self._eligible(message)
+            if self.passthrough:
+                await self._send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if self.compressor is None and not more_body:
+            # 完整响应：小响应原样返回，其余整体压缩（带 ETag 时复用缓存）
+            if len(body) < self.middleware.minimum_size:
+                await self._send(self.start)
+                await self._send(message)
+                return
+            etag = Headers(raw=self.start["headers"]).get("etag")
+            compressed = self.middleware.compress_cached(body, self.encoding, etag)
+            await self._send(self._encoded_start(len(compressed)))
+            await self._send({"type": "http.response.body", "body": compressed})
+            return
+
+        if self.compressor is None:
+            # 流式响应：增量压缩
+            self.compressor = _StreamCompressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            await self._send(self._encoded_start(None))
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.flush()
+        if chunk or not more_body:
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
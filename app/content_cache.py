@@ -0,0 +1,161 @@
+"""
+内容行的进程内读缓存（LRU + TTL）。
+
+按 id / title 缓存已序列化的 schemas.Content（gzip JSON，与 content_rendered 表一致），
+详情接口命中时不访问数据库、不做 ORM 加载与 Pydantic 校验。
+写入失效通过 Session 事件完成：flush 时记录新增/修改/删除的 Content，事务提交后统一失效，
+因此 create_content、update_content、导入覆盖、批量再生成等所有 ORM 写路径都会自动生效；
+其它进程（如导入 CLI）的写入由 TTL 兜底。
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import models, rendered
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("CONTENT_ROW_CACHE_SIZE", "512"))
+DEFAULT_TTL_SECONDS = float(os.getenv("CONTENT_ROW_CACHE_TTL", "300"))
+
+
+@dataclass(frozen=True)
+class CachedContent:
+    id: int
+    title: str
+    updated_at: Optional[datetime]
+    body: bytes  # schemas.Content 的 gzip JSON
+    expires_at: float
+
+
+class ContentCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, CachedContent]" = OrderedDict()
+        self._by_title: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # 每次失效递增；读库前记录，写回时若已变化说明期间有提交，丢弃可能过期的结果
+        self._generation = 0
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    def generation(self) -> int:
+        return self._generation
+
+    def _get(self, content_id: Optional[int]) -> Optional[CachedContent]:
+        with self._lock:
+            entry = self._entries.get(content_id) if content_id is not None else None
+            if entry is not None and entry.expires_at < time.monotonic():
+                self._drop(content_id)
+                self.stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(content_id)
+            self.stats["hits"] += 1
+            return entry
+
+    def get_by_id(self, content_id: int) -> Optional[CachedContent]:
+        return self._get(content_id)
+
+    def get_by_title(self, title: str) -> Optional[CachedContent]:
+        return self._get(self._by_title.get(title))
+
+    def put(self, obj: models.Content, generation: Optional[int] = None) -> CachedContent:
+        """序列化并缓存 ORM 对象"""
+        body = rendered.compress(rendered.render_json(obj))
+        return self.put_rendered(obj.id, obj.title, obj.updated_at, body, generation)
+
+    def put_rendered(self, content_id: int, title: str, updated_at: Optional[datetime], body: bytes, generation: Optional[int] = None) -> CachedContent:
+        """缓存已渲染的 gzip JSON；generation 与当前不一致时只返回结果不缓存"""
+        entry = CachedContent(
+            id=content_id,
+            title=title,
+            updated_at=updated_at,
+            body=body,
+            expires_at=time.monotonic() + self.ttl,
+        )
+        if self.max_entries <= 0:
+            return entry
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return entry
+            self._drop(entry.id)
+            self._entries[entry.id] = entry
+            self._by_title[entry.title] = entry.id
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.stats["evictions"] += 1
+        return entry
+
+    def _drop(self, content_id: int) -> None:
+        entry = self._entries.pop(content_id, None)
+        if entry is not None and self._by_title.get(entry.title) == content_id:
+            del self._by_title[entry.title]
+
+    def invalidate(self, ids: Set[int] = frozenset(), titles: Set[str] = frozenset()) -> None:
+        with self._lock:
+            self._generation += 1
+            for title in titles:
+                content_id = self._by_title.get(title)
+                if content_id is not None:
+                    ids = set(ids) | {content_id}
+            for content_id in ids:
+                if content_id in self._entries:
+                    self._drop(content_id)
+                    self.stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_title.clear()
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+content_cache = ContentCache()
+
+
+# ---------------- 写入失效 ----------------
+
+_PENDING_KEY = "content_cache_pending"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed(session, _flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, (set(), set()))
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.Content):
+            if obj.id is not None:
+                pending[0].add(obj.id)
+            if obj.title:
+                pending[1].add(obj.title)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending and (pending[0] or pending[1]):
+        content_cache.invalidate(*pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session, _previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -1,15 +1,53 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from datetime import datetime
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.orm import Session, load_only
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 from . import models
+from . import search_index  # noqa: F401  导入即注册全文索引同步事件
+from . import rendered  # noqa: F401  导入即注册预渲染同步事件
+from . import content_cache  # noqa: F401  导入即注册读缓存失效事件
 
 
-def get_content(db: Session, module: Optional[str] = None, subcategory: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[models.Content]:
-    query = db.query(models.Content)
+# 可通过 fields= 选择的列；列表摘要只取轻量列，避免加载正文与图表等大字段
+CONTENT_FIELDS = tuple(c.name for c in models.Content.__table__.columns)
+SUMMARY_FIELDS = ("id", "module", "subcategory", "title", "tags", "updated_at")
+# 列表排序键，用于 keyset 分页；module/subcategory 可为 NULL，按空字符串排序与比较
+# （NULL 参与行值比较结果为 NULL，这些行会被游标分页跳过），与 ix_content_list_order 表达式索引一致
+LIST_ORDER_FIELDS = ("module", "subcategory", "id")
+# list_cursor 中各元素的类型（见 pagination.decode_cursor）
+LIST_CURSOR_TYPES = (str, str, int)
+
+
+def list_order_key() -> List[Any]:
+    return [func.coalesce(models.Content.module, ""), func.coalesce(models.Content.subcategory, ""), models.Content.id]
+
+
+def content_list_stmt(module: Optional[str] = None, subcategory: Optional[str] = None, skip: int = 0, limit: int = 100, fields: Optional[Sequence[str]] = None, after: Optional[Sequence[Any]] = None) -> Select:
+    """列表查询语句，同步/异步 CRUD 共用"""
+    stmt = select(models.Content)
+    if fields:
+        # 只 SELECT 需要的列（以及排序键），其余属性保持未加载
+        columns = dict.fromkeys(list(fields) + list(LIST_ORDER_FIELDS))
+        stmt = stmt.options(load_only(*(getattr(models.Content, f) for f in columns)))
     if module:
-        query = query.filter(models.Content.module == module)
+        stmt = stmt.where(models.Content.module == module)
     if subcategory:
-        query = query.filter(models.Content.subcategory == subcategory)
-    return query.offset(skip).limit(limit).all()
+        stmt = stmt.where(models.Content.subcategory == subcategory)
+    order_key = list_order_key()
+    stmt = stmt.order_by(*order_key)
+    if after is not None:
+        return stmt.where(tuple_(*order_key) > tuple_(*after)).limit(limit)
+    return stmt.offset(skip).limit(limit)
+
+
+def get_content(db: Session, module: Optional[str] = None, subcategory: Optional[str] = None, skip: int = 0, limit: int = 100, fields: Optional[Sequence[str]] = None, after: Optional[Sequence[Any]] = None) -> List[models.Content]:
+    """按 (module, subcategory, id) 排序返回内容。after 为上一页最后一行的排序键（keyset 分页），
+    提供时忽略 skip。"""
+    return db.scalars(content_list_stmt(module, subcategory, skip, limit, fields, after)).all()
+
+
+def list_cursor(row: models.Content) -> List[Any]:
+    return [row.module or "", row.subcategory or "", row.id]
 
 
 def get_content_by_id(db: Session, content_id: int) -> Optional[models.Content]:
@@ -20,9 +58,104 @@ def get_content_by_title(db: Session, title: str) -> Optional[models.Content]:
     return db.query(models.Content).filter(models.Content.title == title).first()
 
 
-def create_content(db: Session, content_data: dict) -> models.Content:
+def create_content(db: Session, content_data: dict, commit: bool = True) -> models.Content:
+    """commit=False 时只 flush（取得 id），由调用方按批次提交"""
     obj = models.Content(**content_data)
     db.add(obj)
+    if not commit:
+        db.flush()
+        return obj
+    db.commit()
+    db.refresh(obj)
+    return obj
+
+
+# 可被更新（导入覆盖/再生成）的内容字段
+UPDATABLE_FIELDS = ("module", "subcategory", "content_body", "python_code", "formulas", "charts_data", "tags", "source_hash")
+
+
+def update_content(db: Session, obj: models.Content, content_data: dict, commit: bool = True) -> models.Content:
+    """用 content_data 中出现的字段覆盖 obj；commit=False 时只 flush。
+    不带 source_hash 的更新（如再生成）说明内容已不再对应导入来源，清空指纹。"""
+    for field in UPDATABLE_FIELDS:
+        if field in content_data:
+            setattr(obj, field, content_data[field])
+    if "source_hash" not in content_data:
+        obj.source_hash = None
+    db.add(obj)
+    if not commit:
+        db.flush()
+        return obj
     db.commit()
     db.refresh(obj)
-    return obj
\ No newline at end of file
+    return obj
+
+
+def get_ids_by_titles(db: Session, titles: Iterable[str], chunk_size: int = 500) -> Dict[str, int]:
+    """一次（按块）IN 查询取得 title -> id"""
+    titles = list(dict.fromkeys(titles))
+    found: Dict[str, int] = {}
+    for start in range(0, len(titles), chunk_size):
+        chunk = titles[start:start + chunk_size]
+        found.update(db.execute(select(models.Content.title, models.Content.id).where(models.Content.title.in_(chunk))).all())
+    return found
+
+
+def get_source_hashes(db: Session, titles: Iterable[str], chunk_size: int = 500) -> Dict[str, Tuple[int, Optional[str]]]:
+    """title -> (id, source_hash)，供增量导入判断内容是否变化"""
+    titles = list(dict.fromkeys(titles))
+    found: Dict[str, Tuple[int, Optional[str]]] = {}
+    stmt = select(models.Content.title, models.Content.id, models.Content.source_hash)
+    for start in range(0, len(titles), chunk_size):
+        chunk = titles[start:start + chunk_size]
+        found.update((title, (content_id, source_hash)) for title, content_id, source_hash in db.execute(stmt.where(models.Content.title.in_(chunk))))
+    return found
+
+
+def _dialect_insert(db: Session):
+    name = db.get_bind().dialect.name
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    return insert
+
+
+def bulk_upsert_content(db: Session, rows: List[dict], overwrite: bool = False, batch_size: int = 200) -> Dict[str, int]:
+    """按 title 批量 upsert（INSERT ... ON CONFLICT），每批一条语句，不提交；返回 title -> id。
+
+    overwrite=False 时已存在的标题保持不变（DO NOTHING）。语句不经过 ORM 事件，
+    调用方需在提交前后刷新派生数据（全文索引、预渲染、读缓存），见 importer 的批量导入。
+    """
+    # 同一标题只保留最后一次出现（ON CONFLICT 不允许同一语句内重复更新同一行）
+    rows = list({row["title"]: row for row in rows}.values())
+    if not rows:
+        return {}
+    insert = _dialect_insert(db)
+    now = datetime.utcnow()
+    table = models.Content.__table__
+    for start in range(0, len(rows), batch_size):
+        batch = [{**row, "created_at": now, "updated_at": now} for row in rows[start:start + batch_size]]
+        if insert is None:
+            # 不支持 ON CONFLICT 的数据库：逐行走 ORM
+            existing = {obj.title: obj for obj in db.query(models.Content).filter(models.Content.title.in_([r["title"] for r in batch]))}
+            for row in batch:
+                obj = existing.get(row["title"])
+                if obj is None:
+                    db.add(models.Content(**row))
+                elif overwrite:
+                    update_content(db, obj, row, commit=False)
+            db.flush()
+            continue
+        stmt = insert(table).values(batch)
+        if overwrite:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.title],
+                set_={f: stmt.excluded[f] for f in UPDATABLE_FIELDS + ("updated_at",)},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[table.c.title])
+        db.execute(stmt)
+    return get_ids_by_titles(db, [row["title"] for row in rows])
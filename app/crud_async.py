@@ -0,0 +1,41 @@
+"""crud.py 的异步版本（AsyncSession），供只读接口使用；查询语句与同步版共用。"""
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List, Optional, Sequence, Tuple
+from . import models, rendered, search_index
+from .crud import content_list_stmt
+
+
+async def get_content(db: AsyncSession, module: Optional[str] = None, subcategory: Optional[str] = None, skip: int = 0, limit: int = 100, fields: Optional[Sequence[str]] = None, after: Optional[Sequence[Any]] = None) -> List[models.Content]:
+    return (await db.scalars(content_list_stmt(module, subcategory, skip, limit, fields, after))).all()
+
+
+async def get_content_by_id(db: AsyncSession, content_id: int) -> Optional[models.Content]:
+    return await db.scalar(select(models.Content).where(models.Content.id == content_id))
+
+
+async def content_version(db: AsyncSession, module: Optional[str] = None, subcategory: Optional[str] = None) -> Tuple[int, Optional[datetime], Optional[int]]:
+    """筛选范围内的 (行数, 最大 updated_at, 最大 id)；任一写入（增/删/改）都会使其变化"""
+    stmt = select(func.count(), func.max(models.Content.updated_at), func.max(models.Content.id))
+    if module:
+        stmt = stmt.where(models.Content.module == module)
+    if subcategory:
+        stmt = stmt.where(models.Content.subcategory == subcategory)
+    return tuple((await db.execute(stmt)).one())
+
+
+async def get_rendered(db: AsyncSession, content_id: Optional[int] = None, title: Optional[str] = None):
+    """预渲染的详情 (content_id, title, updated_at, gzip body)，不加载 ORM 对象"""
+    return (await db.execute(rendered.fetch_stmt(content_id=content_id, title=title))).first()
+
+
+async def get_contents_by_ids(db: AsyncSession, content_ids: Sequence[int]) -> List[models.Content]:
+    if not content_ids:
+        return []
+    return (await db.scalars(select(models.Content).where(models.Content.id.in_(content_ids)))).all()
+
+
+async def search(db: AsyncSession, query: str, **kwargs):
+    """全文检索（FTS5 原生 SQL 与 ORM 混合），在异步会话的同步视图上执行，参数同 search_index.search"""
+    return await db.run_sync(search_index.search, query, **kwargs)
@@ -1,16 +1,22 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./ml_learning.db"
+from app.db_engine import make_engine, make_async_engine
+
+# 默认 sqlite 文件 ml_learning.db（可通过环境变量 DATABASE_URL 覆盖，如 postgresql+psycopg2://...）
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ml_learning.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    echo=True,
-)
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 只读接口使用的异步引擎/会话（同一数据库，aiosqlite/asyncpg 驱动）
+async_engine = make_async_engine(SQLALCHEMY_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -19,4 +25,33 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def ensure_schema():
+    """为已存在的表幂等补建索引与新增列（create_all 不会修改已有表）。"""
+    from app import models
+
+    def add_missing_column(conn, column):
+        table = column.table.name
+        if not inspect(conn).has_table(table) or column.name in {c["name"] for c in inspect(conn).get_columns(table)}:
+            return
+        # 列类型按当前方言编译（如 DATETIME 在 PostgreSQL 上为 TIMESTAMP WITHOUT TIME ZONE）
+        column_type = column.type.compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {column_type}"))
+
+    with engine.begin() as conn:
+        add_missing_column(conn, models.Content.__table__.c.source_hash)
+        add_missing_column(conn, models.Job.__table__.c.heartbeat_at)
+        # 旧的列排序索引不含 NULL 处理，替换为与 crud.list_order_key 一致的表达式索引
+        conn.execute(text("DROP INDEX IF EXISTS ix_content_module_subcategory_id"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_content_list_order "
+            "ON content (coalesce(module, ''), coalesce(subcategory, ''), id)"
+        ))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_content_updated_at ON content (updated_at)"))
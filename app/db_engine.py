@@ -0,0 +1,105 @@
+"""
+数据库引擎工厂，主库（app/database.py）与权限库（app/auth/database_auth.py）共用。
+
+所有参数均可通过环境变量配置：
+    DB_ECHO                  是否打印 SQL（默认 0；打开后每条查询都会同步写日志）
+    SQLITE_JOURNAL_MODE      默认 WAL：读不阻塞写，导入任务写入时接口仍可并发读取
+    SQLITE_SYNCHRONOUS       默认 NORMAL（WAL 下可保证一致性，仅断电时可能丢失最近事务）
+    SQLITE_BUSY_TIMEOUT_MS   写锁等待时间，默认 5000
+    SQLITE_MMAP_SIZE         内存映射读取上限（字节），默认 256MB
+    SQLITE_CACHE_SIZE        页缓存，负数表示 KiB，默认 -65536（64MB）
+    DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_RECYCLE / DB_POOL_TIMEOUT
+                             非 SQLite（如 PostgreSQL）连接池参数
+
+make_async_engine() 以相同配置创建异步引擎（sqlite -> aiosqlite，postgresql -> asyncpg）。
+"""
+import os
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+
+def env_flag(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _sqlite_pragmas() -> Dict[str, str]:
+    return {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+        "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+        "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-65536"),
+    }
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.database in (None, "", ":memory:")
+
+
+def _install_sqlite_pragmas(engine: Engine, url) -> None:
+    pragmas = _sqlite_pragmas()
+    if _is_memory_sqlite(url):
+        # 内存库不支持 WAL
+        pragmas.pop("journal_mode")
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def _engine_options(url, echo: Optional[bool], is_async: bool = False) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"echo": env_flag("DB_ECHO") if echo is None else echo}
+    if url.get_backend_name() == "sqlite":
+        busy_ms = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+        options["connect_args"] = {"timeout": busy_ms / 1000}
+        if not is_async:
+            options["connect_args"]["check_same_thread"] = False
+        return options
+    options.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_pre_ping=True,
+    )
+    return options
+
+
+def make_engine(url: str, echo: Optional[bool] = None, **kwargs: Any) -> Engine:
+    """按 URL 方言创建引擎：SQLite 在每个新连接上设置 PRAGMA，其它数据库使用带预检的连接池。"""
+    parsed = make_url(url)
+    engine = create_engine(url, **{**_engine_options(parsed, echo), **kwargs})
+    if parsed.get_backend_name() == "sqlite":
+        _install_sqlite_pragmas(engine, parsed)
+    return engine
+
+
+# 同步驱动 -> 异步驱动
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg", "mysql": "aiomysql"}
+
+
+def to_async_url(url: str):
+    """把同步 URL 换成对应的异步驱动，如 sqlite:///x.db -> sqlite+aiosqlite:///x.db"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend in _ASYNC_DRIVERS and parsed.get_driver_name() != _ASYNC_DRIVERS[backend]:
+        parsed = parsed.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}")
+    return parsed
+
+
+def make_async_engine(url: str, echo: Optional[bool] = None, **kwargs: Any) -> AsyncEngine:
+    """与 make_engine 配置一致的 AsyncEngine（aiosqlite/asyncpg），供异步路由使用。"""
+    parsed = to_async_url(url)
+    engine = create_async_engine(parsed, **{**_engine_options(parsed, echo, is_async=True), **kwargs})
+    if parsed.get_backend_name() == "sqlite":
+        # PRAGMA 监听挂在底层同步引擎上
+        _install_sqlite_pragmas(engine.sync_engine, parsed)
+    return engine
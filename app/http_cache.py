@@ -0,0 +1,54 @@
+"""
+HTTP 条件请求（ETag / If-None-Match）。
+
+内容只在导入/再生成时变化，读接口先用轻量查询（updated_at 等）算出 ETag，
+与客户端缓存一致时直接返回 304，不再加载正文/图表与序列化。
+ETag 使用弱校验（W/"..."），响应经压缩等编码后仍可复用。
+"""
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# 客户端可缓存，但每次使用前需要携带 If-None-Match 重新验证
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    raw = json.dumps(parts, ensure_ascii=False, default=str, separators=(",", ":"))
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+def request_key(request: Request) -> list:
+    """路由 + 查询参数（与顺序无关），用于区分同一资源的不同视图/分页"""
+    return [request.url.path, sorted(request.query_params.multi_items())]
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 弱比较：任一值与 etag 相同或为 * 即命中"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = _opaque(etag)
+    return any(_opaque(tag) == current for tag in header.split(","))
+
+
+def cache_headers(etag: str, cache_control: str = REVALIDATE_CACHE_CONTROL) -> dict:
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def not_modified(etag: str, cache_control: str = REVALIDATE_CACHE_CONTROL) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, cache_control))
+
+
+def apply(response: Optional[Response], etag: str, cache_control: str = REVALIDATE_CACHE_CONTROL) -> None:
+    if response is not None:
+        response.headers.update(cache_headers(etag, cache_control))
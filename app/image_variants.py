@@ -0,0 +1,129 @@
+"""
+图表资源的转码与多尺寸变体（WebP / 优化 PNG，按宽度缩放）。
+
+原图由 app.assets 按 hash 保存；变体写入 IMAGES_DIR/variants/<hash>[.w<宽度>].<格式>：
+- 每个配置宽度（默认 480/960，对应移动端 1x/2x）各一份 WebP 与优化 PNG（只生成比原图窄的）；
+- 原尺寸的 WebP 一份。
+资源写入时预先生成（assets.store_bytes），缺失时由 /chart/{hash} 首次请求按需生成。
+Pillow 为可选依赖，未安装时只提供原图。
+"""
+import io
+import logging
+import os
+from typing import List, Optional, Tuple
+
+from app import assets
+
+try:
+    from PIL import Image, features
+except ImportError:  # pragma: no cover - 可选依赖
+    Image = None
+    features = None
+
+logger = logging.getLogger(__name__)
+
+# 无法解码的位图（截断、损坏、超出像素上限）在生成变体时抛出的异常；变体只是优化，出错时提供原图
+VARIANT_ERRORS = (OSError, ValueError) + ((Image.DecompressionBombError,) if Image is not None else ())
+
+VARIANTS_DIR = os.path.join(assets.IMAGES_DIR, "variants")
+VARIANT_WIDTHS = tuple(sorted(int(w) for w in os.getenv("CHART_VARIANT_WIDTHS", "480,960").split(",") if w.strip()))
+WEBP_QUALITY = int(os.getenv("CHART_WEBP_QUALITY", "80"))
+# 可转码的原图格式（SVG/GIF 原样提供）
+RASTER_FORMATS = ("png", "jpg", "jpeg")
+
+
+def available() -> bool:
+    return Image is not None
+
+
+def webp_supported() -> bool:
+    return Image is not None and features.check("webp")
+
+
+def variant_path(digest: str, fmt: str, width: Optional[int] = None) -> str:
+    name = f"{digest}.w{width}.{fmt}" if width else f"{digest}.{fmt}"
+    return os.path.join(VARIANTS_DIR, name)
+
+
+def _encode(img, fmt: str) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "webp":
+        img.save(buf, format="WEBP", quality=WEBP_QUALITY, method=6)
+    else:
+        img.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def _planned(width: int) -> List[Tuple[str, Optional[int]]]:
+    """(格式, 宽度) 列表，宽度 None 表示原尺寸"""
+    formats = ["webp", "png"] if webp_supported() else ["png"]
+    plan: List[Tuple[str, Optional[int]]] = [(fmt, w) for w in VARIANT_WIDTHS if w < width for fmt in formats]
+    if "webp" in formats:
+        plan.append(("webp", None))
+    return plan
+
+
+def ensure_variants(digest: str, ext: str) -> List[str]:
+    """为原图生成缺失的变体，返回全部变体路径；不可转码时返回空列表"""
+    if not available() or ext not in RASTER_FORMATS:
+        return []
+    source = assets.asset_path(digest, ext)
+    with Image.open(source) as original:
+        original.load()
+        width, height = original.size
+        plan = _planned(width)
+        missing = [(fmt, w) for fmt, w in plan if not os.path.exists(variant_path(digest, fmt, w))]
+        if missing:
+            os.makedirs(VARIANTS_DIR, exist_ok=True)
+            # 保留透明通道；WebP/PNG 均支持 RGBA
+            image = original if original.mode in ("RGB", "RGBA") else original.convert("RGBA")
+            for fmt, w in missing:
+                scaled = image if w is None else image.resize((w, max(1, round(height * w / width))), Image.LANCZOS)
+                assets.write_atomic(variant_path(digest, fmt, w), _encode(scaled, fmt))
+    return [variant_path(digest, fmt, w) for fmt, w in plan]
+
+
+def accepts_webp(accept: str) -> bool:
+    """Accept 中显式列出 image/webp 且 q > 0（不从 */* 推断，旧客户端也会发送 */*）"""
+    for part in (accept or "").split(","):
+        media, _, params = part.strip().partition(";")
+        if media.strip().lower() != "image/webp":
+            continue
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def select(digest: str, ext: str, accept: str = "", width: Optional[int] = None) -> Optional[Tuple[str, str, str]]:
+    """按客户端能力与期望宽度挑选变体，返回 (path, media_type, 变体标识)；应提供原图时返回 None。
+
+    width 为需要的像素宽度：取不小于它的最窄变体，超过所有变体宽度时用原尺寸。
+    """
+    if not available() or ext not in RASTER_FORMATS:
+        return None
+    fmt = "webp" if accepts_webp(accept) and webp_supported() else "png"
+    candidates = [w for w in VARIANT_WIDTHS if width and w >= width]
+    chosen: Optional[int] = candidates[0] if candidates else None
+    if fmt == "png" and chosen is None:
+        return None
+    path = variant_path(digest, fmt, chosen)
+    if not os.path.exists(path):
+        try:
+            ensure_variants(digest, ext)
+        except VARIANT_ERRORS as e:
+            logger.warning("cannot generate variants for %s.%s: %s", digest, ext, e)
+            return None
+    if not os.path.exists(path):
+        # 原图比该宽度还窄，没有生成对应变体
+        if fmt == "png":
+            return None
+        chosen = None
+        path = variant_path(digest, fmt, None)
+        if not os.path.exists(path):
+            return None
+    return path, assets.MIME_TYPES[fmt], f"{fmt}-w{chosen}" if chosen else fmt
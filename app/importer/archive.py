@@ -0,0 +1,156 @@
+"""
+Markdown 压缩包（zip / tar / tar.gz 等）导入。
+
+上传接口把压缩包分块写入 UPLOAD_DIR 后提交后台任务，本模块在任务线程中：
+安全解压（拒绝绝对路径、`..`、链接与设备文件，只取 .md 与图片，限制解压总大小），
+再按批次调用批量导入并上报进度。压缩包与解压目录在任务结束后删除。
+"""
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from collections import Counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .md_importer import DEFAULT_BATCH_SIZE, import_paths, list_markdown_files
+from .md_parser import IMAGE_EXTENSIONS
+
+UPLOAD_DIR = os.getenv("IMPORT_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "md_import_uploads"))
+# 上传压缩包大小上限与解压后总大小上限（防 zip 炸弹）
+MAX_ARCHIVE_BYTES = int(os.getenv("IMPORT_ARCHIVE_MAX_BYTES", str(512 * 1024 * 1024)))
+MAX_EXTRACTED_BYTES = int(os.getenv("IMPORT_ARCHIVE_MAX_EXTRACTED_BYTES", str(2 * 1024 * 1024 * 1024)))
+COPY_CHUNK_SIZE = 1024 * 1024
+
+STATUSES = ("created", "updated", "unchanged", "skipped", "failed")
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+def new_upload_path(filename: Optional[str]) -> str:
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    suffix = "".join(_archive_suffixes(filename or ""))
+    fd, path = tempfile.mkstemp(prefix="upload_", suffix=suffix, dir=UPLOAD_DIR)
+    os.close(fd)
+    return path
+
+
+def _archive_suffixes(filename: str) -> List[str]:
+    name = filename.lower()
+    for suffix in (".tar.gz", ".tar.bz2", ".tar.xz", ".tgz", ".tar", ".zip"):
+        if name.endswith(suffix):
+            return [suffix]
+    return []
+
+
+def is_archive(path: str) -> bool:
+    return zipfile.is_zipfile(path) or tarfile.is_tarfile(path)
+
+
+def _wanted(name: str) -> bool:
+    lowered = name.lower()
+    return lowered.endswith(".md") or lowered.endswith(IMAGE_EXTENSIONS)
+
+
+def _safe_target(dest_dir: str, name: str) -> Optional[str]:
+    """成员在 dest_dir 下的目标路径；绝对路径或跳出目录的名称返回 None"""
+    name = name.replace("\\", "/")
+    if name.startswith("/") or (len(name) > 1 and name[1] == ":"):
+        return None
+    parts = [p for p in name.split("/") if p not in ("", ".")]
+    if not parts or ".." in parts:
+        return None
+    target = os.path.realpath(os.path.join(dest_dir, *parts))
+    root = os.path.realpath(dest_dir)
+    if not target.startswith(root + os.sep):
+        return None
+    return target
+
+
+def _members(archive_path: str) -> Iterator[Tuple[str, int, Callable[[], Any]]]:
+    """(名称, 声明大小, 打开函数)，只包含普通文件"""
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as zf:
+            for info in zf.infolist():
+                # 高 16 位为 unix mode，0o120000 为符号链接
+                if info.is_dir() or (info.external_attr >> 16) & 0o170000 == 0o120000:
+                    continue
+                yield info.filename, info.file_size, lambda info=info: zf.open(info)
+        return
+    with tarfile.open(archive_path, mode="r:*") as tf:
+        for info in tf:
+            if not info.isreg():
+                continue
+            yield info.name, info.size, lambda info=info: tf.extractfile(info)
+
+
+def extract_archive(archive_path: str, dest_dir: str, max_bytes: int = MAX_EXTRACTED_BYTES) -> int:
+    """把压缩包中的 .md 与图片解压到 dest_dir，返回文件数；不安全的成员直接跳过"""
+    if not is_archive(archive_path):
+        raise ArchiveError("not a zip or tar archive")
+    total = 0
+    count = 0
+    for name, size, open_member in _members(archive_path):
+        if not _wanted(name):
+            continue
+        target = _safe_target(dest_dir, name)
+        if target is None:
+            continue
+        if total + size > max_bytes:
+            raise ArchiveError(f"archive expands beyond {max_bytes} bytes")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        written = 0
+        with open_member() as src, open(target, "wb") as dst:
+            while True:
+                chunk = src.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                # 声明大小不可信，按实际写入量再检查一次
+                if total + written > max_bytes:
+                    raise ArchiveError(f"archive expands beyond {max_bytes} bytes")
+                dst.write(chunk)
+        total += written
+        count += 1
+    return count
+
+
+def import_archive(
+    db: Session,
+    archive_path: str,
+    overwrite: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None,
+    remove_archive: bool = True,
+) -> Dict[str, Any]:
+    """解压并导入压缩包中的全部 .md（递归），每批提交一次并上报进度；返回各状态计数与失败文件"""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix="extract_", dir=UPLOAD_DIR)
+    try:
+        extract_archive(archive_path, work_dir)
+        paths = list_markdown_files(work_dir, recursive=True)
+        if progress:
+            progress(0, len(paths))
+        results: List[Dict[str, Any]] = []
+        for start in range(0, len(paths), batch_size):
+            chunk = paths[start:start + batch_size]
+            results += import_paths(db, chunk, work_dir, overwrite=overwrite, bulk=True, batch_size=batch_size, asset_root=work_dir)
+            if progress:
+                progress(len(results), len(paths))
+        counts = Counter(r["status"] for r in results)
+        return {
+            **{status: counts.get(status, 0) for status in STATUSES},
+            "files": len(paths),
+            "failed_files": [r["file"] for r in results if r["status"] == "failed"],
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        if remove_archive:
+            try:
+                os.remove(archive_path)
+            except OSError:
+                pass
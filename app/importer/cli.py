@@ -2,20 +2,77 @@ import argparse
 import os
 from typing import Optional
 
-from app.database import SessionLocal
-from .md_importer import import_directory, import_markdown_file
+from app.database import Base, SessionLocal, engine, ensure_schema
+from .manifest import MANIFEST_NAME, ImportManifest
+from .md_importer import DEFAULT_BATCH_SIZE, import_directory, import_markdown_file, import_paths
+from .watch import DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL, watch_directory
+
+
+def _print_results(results: list) -> None:
+    created = sum(1 for r in results if r['status']=='created')
+    updated = sum(1 for r in results if r['status']=='updated')
+    unchanged = sum(1 for r in results if r['status']=='unchanged')
+    skipped = sum(1 for r in results if r['status']=='skipped')
+    failed = sum(1 for r in results if r['status']=='failed')
+    print({'created': created, 'updated': updated, 'unchanged': unchanged, 'skipped': skipped, 'failed': failed})
+    for r in results:
+        print(r)
+
+
+def _watch(args, manifest_path: Optional[str]) -> None:
+    def import_batch(md_paths: list) -> None:
+        db = SessionLocal()
+        try:
+            manifest = ImportManifest.load(manifest_path) if manifest_path else None
+            results = import_paths(db, md_paths, args.dir, overwrite=True, manifest=manifest)
+            if manifest is not None:
+                manifest.save()
+        finally:
+            db.close()
+        _print_results(results)
+
+    print(f'Watching {args.dir} for changes (Ctrl+C to stop)')
+    watch_directory(
+        args.dir, import_batch, recursive=args.recursive,
+        poll_interval=args.poll_interval, debounce=args.debounce, use_watchdog=False if args.poll else None,
+    )
 
 
 def main(argv: Optional[list] = None):
     parser = argparse.ArgumentParser(description='Import Markdown knowledge points into the database')
-    parser.add_argument('--dir', dest='dir', help='Directory containing .md files (non-recursive)')
+    parser.add_argument('--dir', dest='dir', help='Directory containing .md files')
+    parser.add_argument('--recursive', action='store_true', help='With --dir: also import .md files in subdirectories')
     parser.add_argument('--file', dest='file', help='Single .md file to import')
     parser.add_argument('--overwrite', action='store_true', help='Overwrite existing title if exists')
+    parser.add_argument('--bulk', action='store_true', help='With --dir: parse all files, then upsert in batches within one transaction')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per upsert statement in --bulk mode')
+    parser.add_argument('--workers', type=int, default=1, help='With --dir: parse files in N processes (implies --bulk)')
+    parser.add_argument('--manifest', help=f'With --dir: mtime manifest used to skip unchanged files (default: <dir>/{MANIFEST_NAME})')
+    parser.add_argument('--no-manifest', action='store_true', help='With --dir: do not read or write the mtime manifest')
+    parser.add_argument('--mirror-remote', action='store_true', help='Download remote (http/https) images into the local asset store instead of keeping links')
+    parser.add_argument('--watch', action='store_true', help='With --dir: after the initial import keep re-importing changed .md/image files (implies --overwrite)')
+    parser.add_argument('--poll', action='store_true', help='With --watch: poll file stats even if watchdog is installed')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL, help='With --watch: seconds between polls')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE, help='With --watch: quiet period in seconds before importing a batch of changes')
     args = parser.parse_args(argv)
 
     if not args.dir and not args.file:
         parser.error('Please provide --dir or --file')
+    if args.watch:
+        if not args.dir:
+            parser.error('--watch requires --dir')
+        args.overwrite = True
+
+    if args.mirror_remote:
+        # 通过环境变量传递，进程池中的解析进程同样生效
+        os.environ['IMPORT_MIRROR_REMOTE_IMAGES'] = '1'
 
+    Base.metadata.create_all(bind=engine)
+    ensure_schema()
+    # --file 与 --dir --watch 同时给出时，监听阶段同样需要 manifest 路径
+    manifest_path = None
+    if args.dir and not args.no_manifest:
+        manifest_path = args.manifest or os.path.join(args.dir, MANIFEST_NAME)
     db = SessionLocal()
     try:
         if args.file:
@@ -31,17 +88,17 @@ def main(argv: Optional[list] = None):
         else:
             if not os.path.isdir(args.dir):
                 raise SystemExit(f'Directory not found: {args.dir}')
-            results = import_directory(db, args.dir, overwrite=args.overwrite)
-            created = sum(1 for r in results if r['status']=='created')
-            updated = sum(1 for r in results if r['status']=='updated')
-            skipped = sum(1 for r in results if r['status']=='skipped')
-            failed = sum(1 for r in results if r['status']=='failed')
-            print({'created': created, 'updated': updated, 'skipped': skipped, 'failed': failed})
-            for r in results:
-                print(r)
+            results = import_directory(
+                db, args.dir, overwrite=args.overwrite, bulk=args.bulk, batch_size=args.batch_size,
+                recursive=args.recursive, workers=args.workers, manifest_path=manifest_path,
+            )
+            _print_results(results)
     finally:
         db.close()
 
+    if args.watch:
+        _watch(args, manifest_path)
+
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+目录导入清单：记录每个 .md 文件及其引用的本地图片的 (mtime_ns, size)，以及导入后的 source_hash。
+
+再次导入同一目录时，stat 均未变化、且数据库中该标题的 source_hash 与清单一致的文件
+直接判定为未变化，不读取也不解析；未变化的目录只需 stat 与一次 IN 查询。
+清单只是加速用的缓存，丢失或损坏时退化为按内容指纹比较。
+"""
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from .md_parser import local_image_paths
+
+MANIFEST_NAME = ".md_import_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_stat(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class ImportManifest:
+    def __init__(self, path: str, entries: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.path = path
+        # 相对路径 -> {"stat", "deps": {图片路径: stat}, "title", "hash"}
+        self.entries: Dict[str, Dict[str, Any]] = entries or {}
+
+    @classmethod
+    def load(cls, path: str) -> "ImportManifest":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION and isinstance(data.get("files"), dict):
+                return cls(path, data["files"])
+        except (OSError, ValueError, AttributeError):
+            pass
+        return cls(path)
+
+    def lookup(self, rel_path: str, path: str) -> Optional[Dict[str, Any]]:
+        """文件及其引用图片的 stat 均与记录一致时返回记录，否则 None"""
+        entry = self.entries.get(rel_path)
+        if not entry or file_stat(path) != entry.get("stat"):
+            return None
+        if any(file_stat(dep) != st for dep, st in entry.get("deps", {}).items()):
+            return None
+        return entry
+
+    def record(self, rel_path: str, path: str, title: str, source_hash: str, stat: Optional[List[int]] = None) -> None:
+        """stat 传入导入前取得的值，导入期间被修改的文件下次会重新解析"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except (OSError, ValueError):
+            self.discard(rel_path)
+            return
+        deps = local_image_paths(text, os.path.dirname(os.path.abspath(path)))
+        self.entries[rel_path] = {
+            "stat": stat or file_stat(path),
+            "deps": {os.path.normpath(dep): file_stat(dep) for dep in deps},
+            "title": title,
+            "hash": source_hash,
+        }
+
+    def discard(self, rel_path: str) -> None:
+        self.entries.pop(rel_path, None)
+
+    def prune(self, rel_paths) -> None:
+        """只保留仍然存在的文件"""
+        keep = set(rel_paths)
+        for rel_path in list(self.entries):
+            if rel_path not in keep:
+                del self.entries[rel_path]
+
+    def save(self) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.entries}, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.path)
@@ -1,64 +1,231 @@
 import os
-from typing import Dict, Any, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
 from sqlalchemy.orm import Session
 
-from app import crud
+from app import crud, rendered, search_index
+from app.content_cache import content_cache
 from app.models import Content as ContentModel
+from .manifest import ImportManifest, file_stat
 from .md_parser import parse_markdown
 
+# 批量导入时每条 INSERT ... ON CONFLICT 语句包含的行数
+DEFAULT_BATCH_SIZE = 200
 
-def import_markdown_file(db: Session, file_path: str, overwrite: bool = False) -> Tuple[str, ContentModel | None]:
+
+def import_markdown_file(db: Session, file_path: str, overwrite: bool = False, asset_root: Optional[str] = None) -> Tuple[str, ContentModel | None]:
     """Import a single .md file into DB. Returns (status, content_obj) where status is one of
-    'created', 'updated', 'skipped', 'failed'."""
+    'created', 'updated', 'unchanged' (same source hash as the stored row), 'skipped', 'failed'."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            text = f.read()
-        base_dir = os.path.dirname(os.path.abspath(file_path))
-        _meta, payload = parse_markdown(text, base_dir=base_dir)
-        title = payload.get('title')
-        if not title:
-            return ("failed", None)
-
-        existing = crud.get_content_by_title(db, title)
-        if existing:
-            if overwrite:
-                # update in-place
-                existing.module = payload.get('module', existing.module)
-                existing.subcategory = payload.get('subcategory', existing.subcategory)
-                existing.content_body = payload.get('content_body', existing.content_body)
-                existing.python_code = payload.get('python_code', existing.python_code)
-                existing.formulas = payload.get('formulas', existing.formulas)
-                existing.charts_data = payload.get('charts_data', existing.charts_data)
-                existing.tags = payload.get('tags', existing.tags)
-                db.add(existing)
-                db.commit()
-                db.refresh(existing)
-                return ("updated", existing)
-            else:
-                return ("skipped", existing)
-        else:
-            obj = crud.create_content(db, payload)
-            return ("created", obj)
+        return _write_payload(db, parse_markdown_file(file_path, asset_root=asset_root), overwrite)
     except Exception:
         return ("failed", None)
 
 
-def import_directory(db: Session, dir_path: str, overwrite: bool = False) -> List[Dict[str, Any]]:
-    """Import all .md files under a directory (non-recursive)."""
+def _write_payload(db: Session, payload: Dict[str, Any], overwrite: bool) -> Tuple[str, ContentModel | None]:
+    title = payload.get('title')
+    if not title:
+        return ("failed", None)
+    existing = crud.get_content_by_title(db, title)
+    if existing:
+        if not overwrite:
+            return ("skipped", existing)
+        if existing.source_hash and existing.source_hash == payload.get('source_hash'):
+            # 来源未变化：不写库，updated_at 与下游缓存保持不变
+            return ("unchanged", existing)
+        # update in-place
+        return ("updated", crud.update_content(db, existing, payload))
+    obj = crud.create_content(db, payload)
+    return ("created", obj)
+
+
+def list_markdown_files(dir_path: str, recursive: bool = False) -> List[str]:
+    if not recursive:
+        return [os.path.join(dir_path, name) for name in os.listdir(dir_path) if name.lower().endswith('.md')]
+    paths: List[str] = []
+    for root, dirs, files in os.walk(dir_path):
+        dirs.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith('.md'))
+    return paths
+
+
+def parse_markdown_file(file_path: str, asset_root: Optional[str] = None) -> Dict[str, Any]:
+    """Read and parse one .md file (images resolved relative to the file; outside asset_root ignored).
+    Raises on invalid input."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    _meta, payload = parse_markdown(text, base_dir=os.path.dirname(os.path.abspath(file_path)), asset_root=asset_root)
+    return payload
+
+
+def _parse_or_none(file_path: str, asset_root: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    # 在子进程中执行：解析是纯函数、不访问数据库，失败以 None 返回给写入方
+    try:
+        return parse_markdown_file(file_path, asset_root=asset_root)
+    except Exception:
+        return None
+
+
+def iter_parsed(file_paths: Iterable[str], workers: int = 1, asset_root: Optional[str] = None) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    """Yield (path, payload or None) in input order; workers > 1 parses in a process pool
+    (YAML frontmatter and base64 image inlining are CPU-bound)."""
+    paths = list(file_paths)
+    if workers <= 1 or len(paths) < 2:
+        for path in paths:
+            yield path, _parse_or_none(path, asset_root)
+        return
+    chunksize = max(1, min(16, len(paths) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from zip(paths, pool.map(_parse_or_none, paths, [asset_root] * len(paths), chunksize=chunksize))
+
+
+def import_directory(db: Session, dir_path: str, overwrite: bool = False, bulk: bool = False, batch_size: int = DEFAULT_BATCH_SIZE, recursive: bool = False, workers: int = 1, manifest_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Import all .md files under a directory (subdirectories too when recursive=True).
+    bulk=True (implied by workers > 1) parses files, optionally in a process pool, and streams
+    them to a single writer that upserts in batches within one transaction.
+    With manifest_path, files whose mtime/size (and those of their images) match the manifest and
+    whose stored source hash is current are not read; they are reported 'unchanged' when
+    overwriting and 'skipped' otherwise, as without a manifest.
+    Result 'file' is the path relative to dir_path."""
+    paths = list_markdown_files(dir_path, recursive=recursive)
+    manifest = ImportManifest.load(manifest_path) if manifest_path else None
+    results = import_paths(db, paths, dir_path, overwrite=overwrite, bulk=bulk, batch_size=batch_size, workers=workers, manifest=manifest)
+    if manifest is not None:
+        manifest.prune(os.path.relpath(p, dir_path) for p in paths)
+        manifest.save()
+    return results
+
+
+def import_paths(db: Session, paths: List[str], root: str, overwrite: bool = False, bulk: bool = False, batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1, manifest: Optional[ImportManifest] = None, asset_root: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Import the given .md files (options as in import_directory; 'file' is relative to root).
+    The manifest, if given, is consulted and updated in memory; the caller saves it.
+    asset_root restricts which local images may be inlined (see parse_markdown)."""
+    rel = {p: os.path.relpath(p, root) for p in paths}
+    by_path: Dict[str, Dict[str, Any]] = {}
+    if manifest is not None:
+        by_path = _unchanged_by_manifest(db, manifest, paths, rel, overwrite)
+    pending = [p for p in paths if p not in by_path]
+    stats = {p: file_stat(p) for p in pending} if manifest is not None else {}
+
+    if bulk or workers > 1:
+        results = import_files_bulk(db, pending, overwrite=overwrite, batch_size=batch_size, workers=workers, root=root, asset_root=asset_root)
+    else:
+        results = []
+        for p in pending:
+            status, obj = import_markdown_file(db, p, overwrite=overwrite, asset_root=asset_root)
+            results.append({
+                'file': rel[p],
+                'status': status,
+                'id': getattr(obj, 'id', None),
+                'title': getattr(obj, 'title', None),
+            })
+    by_path.update(zip(pending, results))
+
+    if manifest is not None:
+        _update_manifest(db, manifest, pending, by_path, rel, stats)
+    return [by_path[p] for p in paths]
+
+
+def _unchanged_by_manifest(db: Session, manifest: ImportManifest, paths: List[str], rel: Dict[str, str], overwrite: bool) -> Dict[str, Dict[str, Any]]:
+    # 标题已存在：与不使用清单时一致，overwrite 时为 unchanged，否则为 skipped
+    status = 'unchanged' if overwrite else 'skipped'
+    hits = {p: entry for p in paths if (entry := manifest.lookup(rel[p], p))}
+    current = crud.get_source_hashes(db, [entry['title'] for entry in hits.values()])
+    unchanged: Dict[str, Dict[str, Any]] = {}
+    for p, entry in hits.items():
+        content_id, source_hash = current.get(entry['title'], (None, None))
+        if source_hash and source_hash == entry['hash']:
+            unchanged[p] = {'file': rel[p], 'status': status, 'id': content_id, 'title': entry['title']}
+    return unchanged
+
+
+def _update_manifest(db: Session, manifest: ImportManifest, paths: List[str], by_path: Dict[str, Dict[str, Any]], rel: Dict[str, str], stats: Dict[str, Any]) -> None:
+    # created/updated/unchanged 之后数据库中的指纹即该文件的指纹；skipped/failed 不记录，下次重新比较
+    synced = [p for p in paths if by_path[p]['status'] in ('created', 'updated', 'unchanged')]
+    current = crud.get_source_hashes(db, [by_path[p]['title'] for p in synced])
+    for p in paths:
+        content_id, source_hash = current.get(by_path[p]['title'], (None, None)) if p in synced else (None, None)
+        if source_hash:
+            manifest.record(rel[p], p, by_path[p]['title'], source_hash, stat=stats.get(p))
+        else:
+            manifest.discard(rel[p])
+
+
+def import_files_bulk(db: Session, file_paths: Iterable[str], overwrite: bool = False, batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1, root: Optional[str] = None, asset_root: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Bulk import: parse files (in `workers` processes) and upsert them in batches of batch_size
+    inside a single transaction. Returns per-file results like import_directory."""
+    def _name(path: str) -> str:
+        return os.path.relpath(path, root) if root else os.path.basename(path)
+
+    parsed = ((_name(path), payload) for path, payload in iter_parsed(file_paths, workers=workers, asset_root=asset_root))
+    return write_parsed_bulk(db, parsed, overwrite=overwrite, batch_size=batch_size)
+
+
+def write_parsed_bulk(db: Session, parsed: Iterable[Tuple[str, Optional[Dict[str, Any]]]], overwrite: bool = False, batch_size: int = DEFAULT_BATCH_SIZE) -> List[Dict[str, Any]]:
+    """Single writer for (file name, payload) pairs, consumed as they arrive; payload None marks a
+    parse failure. Each batch does one title lookup and one upsert; everything commits once."""
+    known: Dict[str, Tuple[Optional[int], Optional[str]]] = {}  # title -> (id, source_hash)，已存在或本次写入
     results: List[Dict[str, Any]] = []
-    for name in os.listdir(dir_path):
-        if not name.lower().endswith('.md'):
-            continue
-        p = os.path.join(dir_path, name)
-        status, obj = import_markdown_file(db, p, overwrite=overwrite)
-        results.append({
-            'file': name,
-            'status': status,
-            'id': getattr(obj, 'id', None),
-            'title': getattr(obj, 'title', None),
-        })
+    changed: Set[int] = set()
+    try:
+        batch: List[Tuple[str, Optional[Dict[str, Any]]]] = []
+        for item in parsed:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                changed |= _write_batch(db, batch, known, results, overwrite)
+                batch = []
+        changed |= _write_batch(db, batch, known, results, overwrite)
+        refresh_derived(db, sorted(changed))
+        db.commit()
+    except Exception:
+        db.rollback()
+        for r in results:
+            if r['status'] in ('created', 'updated'):
+                r['status'] = 'failed'
+        return results
+    content_cache.invalidate(ids=changed)
+    for r in results:
+        if r['title'] and r['id'] is None:
+            r['id'] = known.get(r['title'], (None, None))[0]
     return results
 
+
+def _write_batch(db: Session, batch: List[Tuple[str, Optional[Dict[str, Any]]]], known: Dict[str, Tuple[Optional[int], Optional[str]]], results: List[Dict[str, Any]], overwrite: bool) -> Set[int]:
+    titles = {p['title'] for _, p in batch if p and p.get('title')}
+    known.update(crud.get_source_hashes(db, [t for t in titles if t not in known]))
+    rows: List[Dict[str, Any]] = []
+    for name, payload in batch:
+        title = payload.get('title') if payload else None
+        if not title:
+            results.append({'file': name, 'status': 'failed', 'id': None, 'title': None})
+            continue
+        content_id, source_hash = known.get(title, (None, None))
+        if title not in known:
+            status = 'created'
+        elif not overwrite:
+            status = 'skipped'
+        elif source_hash and source_hash == payload.get('source_hash'):
+            status = 'unchanged'
+        else:
+            status = 'updated'
+        if status in ('created', 'updated'):
+            rows.append(payload)
+            known[title] = (content_id, payload.get('source_hash'))
+        results.append({'file': name, 'status': status, 'id': content_id, 'title': title})
+    ids = crud.bulk_upsert_content(db, rows, overwrite=overwrite, batch_size=len(rows) or 1)
+    for title, content_id in ids.items():
+        known[title] = (content_id, known[title][1])
+    return {ids[r['title']] for r in rows if r['title'] in ids}
+
+
+def refresh_derived(db: Session, content_ids: List[int]) -> None:
+    """Bulk upserts bypass ORM events: rebuild full-text index and pre-rendered JSON for these rows
+    in the current transaction (the read cache is invalidated by the caller after commit)."""
+    if not content_ids:
+        return
+    search_index.reindex_rows(db.connection(), content_ids)
+    rendered.refresh_rows(db, content_ids)
+
 # New: import from raw markdown text (for API)
 
 def import_markdown_text(db: Session, md_text: str, *, base_dir: str | None = None, overwrite: bool = False) -> Tuple[str, ContentModel | None]:
@@ -66,28 +233,8 @@ def import_markdown_text(db: Session, md_text: str, *, base_dir: str | None = No
     Import a Markdown text into DB. Returns (status, content_obj).
     """
     try:
-        _meta, payload = parse_markdown(md_text, base_dir=base_dir)
-        title = payload.get('title')
-        if not title:
-            return ("failed", None)
-        existing = crud.get_content_by_title(db, title)
-        if existing:
-            if overwrite:
-                existing.module = payload.get('module', existing.module)
-                existing.subcategory = payload.get('subcategory', existing.subcategory)
-                existing.content_body = payload.get('content_body', existing.content_body)
-                existing.python_code = payload.get('python_code', existing.python_code)
-                existing.formulas = payload.get('formulas', existing.formulas)
-                existing.charts_data = payload.get('charts_data', existing.charts_data)
-                existing.tags = payload.get('tags', existing.tags)
-                db.add(existing)
-                db.commit()
-                db.refresh(existing)
-                return ("updated", existing)
-            else:
-                return ("skipped", existing)
-        else:
-            obj = crud.create_content(db, payload)
-            return ("created", obj)
+        # API 传入的文本不代为抓取远程图片
+        _meta, payload = parse_markdown(md_text, base_dir=base_dir, mirror_remote=False)
+        return _write_payload(db, payload, overwrite)
     except Exception:
-        return ("failed", None)
\ No newline at end of file
+        return ("failed", None)
@@ -1,7 +1,12 @@
 import os
 import re
 import base64
-from typing import Dict, Any, Tuple, Optional
+import hashlib
+import urllib.request
+from typing import Dict, Any, List, Tuple, Optional
+
+from app import assets
+from app.db_engine import env_flag
 
 try:
     import yaml  # type: ignore
@@ -22,33 +27,108 @@ _DEF_MIME = {
     ".gif": "image/gif",
     ".svg": "image/svg+xml",
 }
+# 会被内联/引用的本地图片扩展名
+IMAGE_EXTENSIONS = tuple(_DEF_MIME)
+
+# 远程图片镜像（IMPORT_MIRROR_REMOTE_IMAGES=1 或 cli --mirror-remote）：下载后存入资源库，失败时保留外链
+REMOTE_IMAGE_TIMEOUT = float(os.getenv("IMPORT_REMOTE_IMAGE_TIMEOUT", "10"))
+REMOTE_IMAGE_MAX_BYTES = int(os.getenv("IMPORT_REMOTE_IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+
+# 进程内缓存：(realpath, mtime_ns, size) -> sha256，url -> 引用；多篇笔记引用同一图片时只读取/写入一次
+_local_assets: Dict[Tuple[str, int, int], str] = {}
+_remote_assets: Dict[str, Optional[Dict[str, Any]]] = {}
 
 
 def _is_url(s: str) -> bool:
     return bool(re.match(r"^(https?:)?//", s))
 
 
-def _to_data_uri(path: str) -> Optional[str]:
-    ext = os.path.splitext(path)[1].lower()
-    mime = _DEF_MIME.get(ext, "application/octet-stream")
+def _resolve_local(url: str, base_dir: Optional[str]) -> str:
+    if base_dir and not os.path.isabs(url):
+        return os.path.join(base_dir, url)
+    return url
+
+
+def _is_within(path: str, root: str) -> bool:
+    root = os.path.realpath(root)
+    return os.path.realpath(path).startswith(root.rstrip(os.sep) + os.sep)
+
+
+def _read_bytes(path: str) -> Optional[bytes]:
     try:
         with open(path, "rb") as f:
-            data = f.read()
-        b64 = base64.b64encode(data).decode("ascii")
-        return f"data:{mime};base64,{b64}"
+            return f.read()
     except Exception:
         return None
 
 
-def parse_markdown(md_text: str, base_dir: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+def _to_data_uri(path: str, data: Optional[bytes] = None) -> Optional[str]:
+    ext = os.path.splitext(path)[1].lower()
+    mime = _DEF_MIME.get(ext, "application/octet-stream")
+    if data is None:
+        data = _read_bytes(path)
+    if data is None:
+        return None
+    b64 = base64.b64encode(data).decode("ascii")
+    return f"data:{mime};base64,{b64}"
+
+
+def _store_local_image(path: str, ext: str) -> Optional[str]:
+    """把本地图片写入资源库（按内容去重），返回 sha256；文件不可读时返回 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (os.path.realpath(path), st.st_mtime_ns, st.st_size)
+    digest = _local_assets.get(key)
+    if digest is not None and os.path.exists(assets.asset_path(digest, ext)):
+        return digest
+    data = _read_bytes(path)
+    if data is None:
+        return None
+    digest = assets.store_bytes(data, ext)
+    _local_assets[key] = digest
+    return digest
+
+
+def _mirror_remote_image(url: str) -> Optional[Dict[str, Any]]:
+    if url in _remote_assets:
+        return _remote_assets[url]
+    ref = None
+    try:
+        request = urllib.request.Request("https:" + url if url.startswith("//") else url, headers={"User-Agent": "md-importer"})
+        with urllib.request.urlopen(request, timeout=REMOTE_IMAGE_TIMEOUT) as resp:
+            ext = assets.ext_for_mime(resp.headers.get_content_type())
+            data = resp.read(REMOTE_IMAGE_MAX_BYTES + 1) if ext else b""
+        if ext and data and len(data) <= REMOTE_IMAGE_MAX_BYTES:
+            ref = {**assets.store_chart(data, ext), "source": url}
+    except (OSError, ValueError):
+        ref = None
+    _remote_assets[url] = ref
+    return ref
+
+
+def local_image_paths(md_text: str, base_dir: Optional[str] = None) -> List[str]:
+    """Local image files referenced by the Markdown (resolved against base_dir), in order."""
+    return [_resolve_local(url, base_dir) for _alt, url in _IMG_RE.findall(md_text) if not _is_url(url)]
+
+
+def parse_markdown(md_text: str, base_dir: Optional[str] = None, asset_root: Optional[str] = None, mirror_remote: Optional[bool] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """
     Parse a Markdown text with optional YAML frontmatter and extract fields
     for DB insertion. Returns (meta, payload) where:
       - meta: raw metadata/frontmatter
       - payload: dict that maps to ContentCreate fields
+    asset_root: if given, local images outside this directory are ignored
+    (used for untrusted uploads so a note cannot inline arbitrary server files).
+    Local images are stored once in the content-addressed asset store (app.assets) and
+    referenced by hash; remote images are mirrored the same way when mirror_remote
+    (default: IMPORT_MIRROR_REMOTE_IMAGES) is on, otherwise kept as links.
     """
     meta: Dict[str, Any] = {}
     body = md_text
+    # 来源指纹：Markdown 原文 + 引用的本地图片内容，用于增量导入时判断是否变化
+    source_hash = hashlib.sha256(md_text.encode("utf-8"))
 
     # Extract YAML frontmatter at top
     m = _FRONTMATTER_RE.match(md_text)
@@ -83,20 +163,35 @@ def parse_markdown(md_text: str, base_dir: Optional[str] = None) -> Tuple[Dict[s
             if k not in formulas:
                 formulas[k] = v
 
-    # Extract images -> charts_data
+    # Extract images -> charts_data：本地图片按内容存入资源库，charts_data 只保存引用
+    if mirror_remote is None:
+        # 不可信来源（限定了 asset_root 的上传）不代为请求外部地址
+        mirror_remote = env_flag("IMPORT_MIRROR_REMOTE_IMAGES") and not asset_root
     charts_data: Dict[str, Any] = {}
     for alt, url in _IMG_RE.findall(body):
         name = alt.strip() or os.path.basename(url).split(".")[0]
         if _is_url(url):
-            charts_data[name] = url
-        else:
-            # resolve relative path
-            p = url
-            if base_dir and not os.path.isabs(p):
-                p = os.path.join(base_dir, p)
-            data_uri = _to_data_uri(p)
-            if data_uri:
-                charts_data[name] = data_uri
+            charts_data[name] = (_mirror_remote_image(url) if mirror_remote else None) or url
+            continue
+        # resolve relative path
+        p = _resolve_local(url, base_dir)
+        if asset_root and not _is_within(p, asset_root):
+            continue
+        source_hash.update(b"\0" + url.encode("utf-8") + b"\0")
+        ext = os.path.splitext(p)[1].lower().lstrip(".")
+        if ext in assets.MIME_TYPES:
+            digest = _store_local_image(p, ext)
+            if digest:
+                source_hash.update(bytes.fromhex(digest))
+                charts_data[name] = assets.chart_ref(digest, ext)
+            continue
+        # 资源库不支持的类型仍内联为 data URI
+        data = _read_bytes(p)
+        if data is not None:
+            source_hash.update(hashlib.sha256(data).digest())
+        data_uri = _to_data_uri(p, data)
+        if data_uri:
+            charts_data[name] = data_uri
 
     # Build payload for DB
     module = str(meta.get("module", "")).strip()
@@ -113,6 +208,7 @@ def parse_markdown(md_text: str, base_dir: Optional[str] = None) -> Tuple[Dict[s
         "formulas": formulas or None,
         "charts_data": charts_data or None,
         "tags": tags,
+        "source_hash": source_hash.hexdigest(),
     }
 
     # Basic validation
@@ -0,0 +1,238 @@
+"""
+Markdown 目录监听：文件变化后只重新导入受影响的标题。
+
+- 事件来源：安装了 watchdog 时使用 inotify 等系统通知，否则定时 stat 轮询
+  （轮询同时覆盖目录外被引用的图片）。
+- 图片变化通过「图片 -> 引用它的 .md」反向索引映射到文档。
+- 一段时间（debounce）内没有新事件后才批量导入，编辑器连续保存只触发一次。
+- 删除 .md 不会删除数据库中的内容，只从索引和清单中移除。
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+from .md_parser import IMAGE_EXTENSIONS, local_image_paths
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - 可选依赖
+    FileSystemEventHandler = object
+    Observer = None
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_DEBOUNCE = 0.5
+
+
+def _norm(path: str) -> str:
+    return os.path.normpath(os.path.abspath(path))
+
+
+def _is_markdown(path: str) -> bool:
+    return path.lower().endswith('.md')
+
+
+def _is_watched(path: str) -> bool:
+    return _is_markdown(path) or path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+class ImageIndex:
+    """.md -> 引用的本地图片，以及反向的 图片 -> 引用它的 .md"""
+
+    def __init__(self):
+        self._deps: Dict[str, Set[str]] = {}
+        self._users: Dict[str, Set[str]] = {}
+
+    def update(self, md_path: str) -> None:
+        self.remove(md_path)
+        try:
+            with open(md_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, ValueError):
+            return
+        deps = {_norm(p) for p in local_image_paths(text, os.path.dirname(md_path))}
+        self._deps[md_path] = deps
+        for dep in deps:
+            self._users.setdefault(dep, set()).add(md_path)
+
+    def remove(self, md_path: str) -> None:
+        for dep in self._deps.pop(md_path, ()):
+            users = self._users.get(dep)
+            if users is not None:
+                users.discard(md_path)
+                if not users:
+                    del self._users[dep]
+
+    def users_of(self, image_path: str) -> Set[str]:
+        return set(self._users.get(image_path, ()))
+
+    def images(self) -> Set[str]:
+        return set(self._users)
+
+
+class _PollingSource:
+    def __init__(self, watcher: "DirectoryWatcher", interval: float):
+        self.watcher = watcher
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Optional[tuple]]:
+        snapshot: Dict[str, Optional[tuple]] = {}
+        for path in self.watcher.scan_files() | self.watcher.index.images():
+            try:
+                st = os.stat(path)
+                snapshot[path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                snapshot[path] = None
+        return snapshot
+
+    def poll(self, timeout: float) -> Set[str]:
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._scan()
+        changed = {p for p in snapshot.keys() | self._snapshot.keys() if snapshot.get(p) != self._snapshot.get(p)}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, source: "_WatchdogSource"):
+        self.source = source
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        for path in (getattr(event, 'src_path', None), getattr(event, 'dest_path', None)):
+            if path and _is_watched(path):
+                self.source.push(_norm(path))
+
+
+class _WatchdogSource:
+    def __init__(self, watcher: "DirectoryWatcher"):
+        self._changed: Set[str] = set()
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._observer = Observer()
+        self._observer.schedule(_EventHandler(self), watcher.dir_path, recursive=watcher.recursive)
+        self._observer.start()
+
+    def push(self, path: str) -> None:
+        with self._lock:
+            self._changed.add(path)
+        self._event.set()
+
+    def poll(self, timeout: float) -> Set[str]:
+        self._event.wait(timeout)
+        with self._lock:
+            changed, self._changed = self._changed, set()
+            self._event.clear()
+        return changed
+
+    def close(self) -> None:
+        self._observer.stop()
+        self._observer.join()
+
+
+class DirectoryWatcher:
+    def __init__(
+        self,
+        dir_path: str,
+        recursive: bool = False,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        debounce: float = DEFAULT_DEBOUNCE,
+        use_watchdog: Optional[bool] = None,
+    ):
+        self.dir_path = _norm(dir_path)
+        self.recursive = recursive
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.index = ImageIndex()
+        for md_path in self.scan_files():
+            if _is_markdown(md_path):
+                self.index.update(md_path)
+        if use_watchdog is None:
+            use_watchdog = Observer is not None
+        if use_watchdog and Observer is None:
+            raise RuntimeError("watchdog is required for event-based watching. Please install watchdog.")
+        self.source = _WatchdogSource(self) if use_watchdog else _PollingSource(self, poll_interval)
+        self._stop = threading.Event()
+
+    @property
+    def backend(self) -> str:
+        return 'watchdog' if isinstance(self.source, _WatchdogSource) else 'polling'
+
+    def scan_files(self) -> Set[str]:
+        """目录下被监听的 .md 与图片文件"""
+        found: Set[str] = set()
+        for root, dirs, files in os.walk(self.dir_path):
+            found.update(os.path.join(root, name) for name in files if _is_watched(name))
+            if not self.recursive:
+                break
+        return found
+
+    def _in_scope(self, path: str) -> bool:
+        parent = os.path.dirname(path)
+        if self.recursive:
+            return parent == self.dir_path or parent.startswith(self.dir_path + os.sep)
+        return parent == self.dir_path
+
+    def affected(self, changed: Set[str]) -> List[str]:
+        """把变化的文件映射为需要重新导入的 .md（并同步反向索引）"""
+        md_paths: Set[str] = set()
+        for path in changed:
+            if _is_markdown(path):
+                if not self._in_scope(path):
+                    continue
+                if os.path.isfile(path):
+                    self.index.update(path)
+                    md_paths.add(path)
+                else:
+                    self.index.remove(path)
+            else:
+                md_paths |= {p for p in self.index.users_of(path) if os.path.isfile(p)}
+        return sorted(md_paths)
+
+    def changes(self) -> Iterator[List[str]]:
+        """阻塞迭代：每次产出一批（已去抖）需要重新导入的 .md 路径"""
+        pending: Set[str] = set()
+        last_event = 0.0
+        while not self._stop.is_set():
+            got = self.source.poll(self.debounce if pending else self.poll_interval)
+            if got:
+                pending |= got
+                last_event = time.monotonic()
+                continue
+            if pending and time.monotonic() - last_event >= self.debounce:
+                md_paths = self.affected(pending)
+                pending = set()
+                if md_paths:
+                    yield md_paths
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def close(self) -> None:
+        self.stop()
+        self.source.close()
+
+
+def watch_directory(
+    dir_path: str,
+    import_batch: Callable[[List[str]], None],
+    recursive: bool = False,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    debounce: float = DEFAULT_DEBOUNCE,
+    use_watchdog: Optional[bool] = None,
+) -> None:
+    """监听目录直到 KeyboardInterrupt，每批变化调用 import_batch(md_paths)"""
+    watcher = DirectoryWatcher(dir_path, recursive=recursive, poll_interval=poll_interval, debounce=debounce, use_watchdog=use_watchdog)
+    try:
+        for md_paths in watcher.changes():
+            import_batch(md_paths)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
@@ -1,98 +1,163 @@
-from app.database import SessionLocal, engine, Base
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from app.database import SessionLocal, engine, Base, ensure_schema
 from app import crud, models
-from app.ml_content.content_generator import ContentGenerator
+from app.ml_content import get_content_generator
 
+if TYPE_CHECKING:
+    # 生成器栈（matplotlib/sklearn 等）仅在真正生成内容时导入，见 app.ml_content.get_content_generator
+    from app.ml_content.content_generator import ContentGenerator
 
-def populate_math_contents(db: SessionLocal, generator: ContentGenerator) -> int:
-    """批量生成并插入数学内容，返回新增数量"""
-    math_topics = [
-        # 基础概念
-        {"module": "math", "subcategory": "基础概念", "title": "常量与变量"},
-        {"module": "math", "subcategory": "基础概念", "title": "函数定义与调用"},
-        # 代数运算
-        {"module": "math", "subcategory": "代数运算", "title": "幂运算"},
-        {"module": "math", "subcategory": "代数运算", "title": "平方根计算"},
-        {"module": "math", "subcategory": "代数运算", "title": "多项式函数"},
-        # 特殊函数
-        {"module": "math", "subcategory": "特殊函数", "title": "三角函数"},
-        {"module": "math", "subcategory": "特殊函数", "title": "求和运算"},
-        {"module": "math", "subcategory": "特殊函数", "title": "乘积运算"},
-        {"module": "math", "subcategory": "特殊函数", "title": "随机数生成"},
-        {"module": "math", "subcategory": "特殊函数", "title": "绝对值函数"},
-        # 线性代数
-        {"module": "math", "subcategory": "线性代数", "title": "标量与向量"},
-        {"module": "math", "subcategory": "线性代数", "title": "矩阵与张量"},
-        {"module": "math", "subcategory": "线性代数", "title": "行列向量转换"},
-        {"module": "math", "subcategory": "线性代数", "title": "向量的转置"},
-        {"module": "math", "subcategory": "线性代数", "title": "向量的加减运算"},
-        {"module": "math", "subcategory": "线性代数", "title": "向量的点积和范数"},
-        {"module": "math", "subcategory": "线性代数", "title": "矩阵的乘法运算"},
-        # 微积分与应用
-        {"module": "math", "subcategory": "微积分", "title": "导数概念与计算"},
-        {"module": "math", "subcategory": "微积分", "title": "偏导数计算"},
-        {"module": "math", "subcategory": "应用", "title": "损失函数(MSE/MAE)"},
-        {"module": "math", "subcategory": "应用", "title": "激活函数(Sigmoid/ReLU/Tanh)"},
-    ]
+# 批量写入时每多少条提交一次
+DEFAULT_BATCH_SIZE = 10
+
+ProgressCallback = Callable[[int, int], None]
+
+MATH_TOPICS = [
+    # 基础概念
+    {"module": "math", "subcategory": "基础概念", "title": "常量与变量"},
+    {"module": "math", "subcategory": "基础概念", "title": "函数定义与调用"},
+    # 代数运算
+    {"module": "math", "subcategory": "代数运算", "title": "幂运算"},
+    {"module": "math", "subcategory": "代数运算", "title": "平方根计算"},
+    {"module": "math", "subcategory": "代数运算", "title": "多项式函数"},
+    # 特殊函数
+    {"module": "math", "subcategory": "特殊函数", "title": "三角函数"},
+    {"module": "math", "subcategory": "特殊函数", "title": "求和运算"},
+    {"module": "math", "subcategory": "特殊函数", "title": "乘积运算"},
+    {"module": "math", "subcategory": "特殊函数", "title": "随机数生成"},
+    {"module": "math", "subcategory": "特殊函数", "title": "绝对值函数"},
+    # 线性代数
+    {"module": "math", "subcategory": "线性代数", "title": "标量与向量"},
+    {"module": "math", "subcategory": "线性代数", "title": "矩阵与张量"},
+    {"module": "math", "subcategory": "线性代数", "title": "行列向量转换"},
+    {"module": "math", "subcategory": "线性代数", "title": "向量的转置"},
+    {"module": "math", "subcategory": "线性代数", "title": "向量的加减运算"},
+    {"module": "math", "subcategory": "线性代数", "title": "向量的点积和范数"},
+    {"module": "math", "subcategory": "线性代数", "title": "矩阵的乘法运算"},
+    # 微积分与应用
+    {"module": "math", "subcategory": "微积分", "title": "导数概念与计算"},
+    {"module": "math", "subcategory": "微积分", "title": "偏导数计算"},
+    {"module": "math", "subcategory": "应用", "title": "损失函数(MSE/MAE)"},
+    {"module": "math", "subcategory": "应用", "title": "激活函数(Sigmoid/ReLU/Tanh)"},
+]
+
+ML_TOPICS = [
+    # 回归
+    {"module": "ml", "subcategory": "回归算法", "title": "线性回归"},
+    {"module": "ml", "subcategory": "分类算法", "title": "逻辑回归"},
+    # 核心分类算法
+    {"module": "ml", "subcategory": "分类算法", "title": "决策树"},
+    {"module": "ml", "subcategory": "分类算法", "title": "支持向量机"},
+    {"module": "ml", "subcategory": "分类算法", "title": "K近邻"},
+    {"module": "ml", "subcategory": "分类算法", "title": "朴素贝叶斯"},
+    {"module": "ml", "subcategory": "集成学习", "title": "随机森林"},
+    {"module": "ml", "subcategory": "集成学习", "title": "梯度提升机"},
+]
 
+
+def _populate_topics(
+    db: SessionLocal,
+    generator: "ContentGenerator",
+    topics: List[Dict[str, str]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[ProgressCallback] = None,
+    workers: Optional[int] = None,
+) -> int:
+    """为不存在的主题生成并插入内容（多进程生成），按批次提交，返回新增数量"""
+    from app.ml_content.parallel import generate_many
+
+    titles = [t["title"] for t in topics]
+    existing = {
+        title for (title,) in db.query(models.Content.title).filter(models.Content.title.in_(titles)).all()
+    }
+    missing: List[Dict[str, str]] = []
+    for topic in topics:
+        if topic["title"] not in existing:
+            missing.append(topic)
+            existing.add(topic["title"])
+
+    specs = [(t["module"], t["subcategory"], t["title"]) for t in missing]
     created = 0
-    for topic in math_topics:
-        content = crud.get_content_by_title(db, topic["title"])
-        if not content:
-            generated = generator.generate_content(
-                topic["module"], topic["subcategory"], topic["title"]
-            )
-            crud.create_content(
-                db,
-                {
-                    "module": topic["module"],
-                    "subcategory": topic["subcategory"],
-                    "title": topic["title"],
-                    **generated,
-                },
-            )
-            created += 1
+    for (module, subcategory, title), generated in generate_many(specs, generator, workers=workers):
+        crud.create_content(
+            db,
+            {
+                "module": module,
+                "subcategory": subcategory,
+                "title": title,
+                **generated,
+            },
+            commit=False,
+        )
+        created += 1
+        if created % batch_size == 0:
+            db.commit()
+            if progress:
+                progress(created, len(specs))
+    db.commit()
+    if progress:
+        progress(created, len(specs))
     return created
 
 
-def populate_ml_contents(db: SessionLocal, generator: ContentGenerator) -> int:
+def populate_math_contents(db: SessionLocal, generator: "ContentGenerator", batch_size: int = DEFAULT_BATCH_SIZE, progress: Optional[ProgressCallback] = None, workers: Optional[int] = None) -> int:
+    """批量生成并插入数学内容，返回新增数量"""
+    return _populate_topics(db, generator, MATH_TOPICS, batch_size=batch_size, progress=progress, workers=workers)
+
+
+def populate_ml_contents(db: SessionLocal, generator: "ContentGenerator", batch_size: int = DEFAULT_BATCH_SIZE, progress: Optional[ProgressCallback] = None, workers: Optional[int] = None) -> int:
     """批量生成并插入机器学习（算法理论与实践）内容，返回新增数量"""
-    ml_topics = [
-        # 回归
-        {"module": "ml", "subcategory": "回归算法", "title": "线性回归"},
-        {"module": "ml", "subcategory": "分类算法", "title": "逻辑回归"},
-        # 核心分类算法
-        {"module": "ml", "subcategory": "分类算法", "title": "决策树"},
-        {"module": "ml", "subcategory": "分类算法", "title": "支持向量机"},
-        {"module": "ml", "subcategory": "分类算法", "title": "K近邻"},
-        {"module": "ml", "subcategory": "分类算法", "title": "朴素贝叶斯"},
-        {"module": "ml", "subcategory": "集成学习", "title": "随机森林"},
-        {"module": "ml", "subcategory": "集成学习", "title": "梯度提升机"},
-    ]
+    return _populate_topics(db, generator, ML_TOPICS, batch_size=batch_size, progress=progress, workers=workers)
 
-    created = 0
-    for topic in ml_topics:
-        content = crud.get_content_by_title(db, topic["title"])
-        if not content:
-            generated = generator.generate_content(
-                topic["module"], topic["subcategory"], topic["title"]
-            )
-            crud.create_content(
-                db,
-                {
-                    "module": topic["module"],
-                    "subcategory": topic["subcategory"],
-                    "title": topic["title"],
-                    **generated,
-                },
-            )
-            created += 1
-    return created
+
+def regenerate_contents(
+    db: SessionLocal,
+    generator: "ContentGenerator",
+    modules: List[str],
+    subcategories: Optional[List[str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[ProgressCallback] = None,
+    workers: Optional[int] = None,
+) -> int:
+    """根据模块/子类批量再生成内容（多进程生成）并覆盖现有记录，按批次提交，返回更新数量"""
+    from app.ml_content.parallel import generate_many
+
+    query = db.query(models.Content)
+    # 仅筛选指定模块
+    if modules:
+        query = query.filter(models.Content.module.in_(modules))
+    # 可选：筛选子分类
+    if subcategories:
+        query = query.filter(models.Content.subcategory.in_(subcategories))
+
+    items: List[models.Content] = query.order_by(models.Content.id).all()
+    # 使用同一生成器按原有三元组(module, subcategory, title)再生成
+    specs = [(item.module, item.subcategory, item.title) for item in items]
+    updated = 0
+
+    for item, (_spec, generated) in zip(items, generate_many(specs, generator, workers=workers)):
+        # 覆盖更新关键字段
+        for field in ("content_body", "python_code", "formulas", "charts_data", "tags"):
+            if field in generated:
+                setattr(item, field, generated[field])
+        # 内容不再对应 Markdown 来源，清空导入指纹，之后的覆盖导入不会被当作"未变化"跳过
+        item.source_hash = None
+        db.add(item)
+        updated += 1
+        if updated % batch_size == 0 or updated == len(items):
+            db.commit()
+            if progress:
+                progress(updated, len(items))
+
+    return updated
 
 
 def main():
     Base.metadata.create_all(bind=engine)
+    ensure_schema()
     db = SessionLocal()
-    generator = ContentGenerator()
+    generator = get_content_generator()
     try:
         created = populate_math_contents(db, generator)
         print(f"数学内容初始化完成，新增 {created} 条记录。")
@@ -0,0 +1,200 @@
+"""
+进程内后台任务队列。
+
+任务记录持久化在 jobs 表中，提交后立即返回 job id；单个 worker 线程按提交顺序执行，
+避免多个长事务同时争抢 SQLite 写锁。处理函数通过 @handler(kind) 注册，
+签名为 fn(db, ctx, params) -> dict，其中 ctx.report(done, total) 用于上报进度。
+
+任务由 queued 原子地改为 running 才会执行（_claim），多个进程（多个 uvicorn worker）
+都把同一任务入队时只有一个会执行。running 任务由执行线程定期刷新 heartbeat_at；
+start_worker(resume=True) 把心跳超时（执行进程已退出）的任务改回 queued 后与其余 queued 任务一起入队，
+因此处理函数应当是幂等的。
+"""
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# 批量写入的提交粒度（条）
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", "10"))
+# running 任务的心跳间隔；超过 JOB_STALE_SECONDS 未刷新的任务在 resume 时重新入队
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "30"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "300"))
+
+Handler = Callable[[Session, "JobContext", Dict[str, Any]], Dict[str, Any]]
+
+_handlers: Dict[str, Handler] = {}
+_queue: "queue.Queue[int]" = queue.Queue()
+_worker: Optional[threading.Thread] = None
+_worker_lock = threading.Lock()
+
+
+def handler(kind: str):
+    """注册某类任务的处理函数"""
+    def decorator(fn: Handler) -> Handler:
+        _handlers[kind] = fn
+        return fn
+    return decorator
+
+
+class JobContext:
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+
+    def report(self, done: int, total: Optional[int] = None) -> None:
+        """更新进度（独立会话提交，不影响任务自身的事务）"""
+        _update(self.job_id, progress=done, **({"total": total} if total is not None else {}))
+
+
+def _update(job_id: int, **values) -> None:
+    db = SessionLocal()
+    try:
+        db.query(models.Job).filter(models.Job.id == job_id).update(values)
+        db.commit()
+    finally:
+        db.close()
+
+
+def submit(kind: str, params: Optional[Dict[str, Any]] = None) -> models.Job:
+    """创建任务记录并入队，立即返回"""
+    if kind not in _handlers:
+        raise ValueError(f"unknown job kind: {kind}")
+    db = SessionLocal()
+    try:
+        job = models.Job(kind=kind, status="queued", params=params or {}, progress=0, total=0)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        db.expunge(job)
+    finally:
+        db.close()
+    start_worker()
+    _queue.put(job.id)
+    return job
+
+
+def get_job(db: Session, job_id: int) -> Optional[models.Job]:
+    return db.query(models.Job).filter(models.Job.id == job_id).first()
+
+
+def list_jobs(db: Session, kind: Optional[str] = None, limit: int = 20):
+    query = db.query(models.Job)
+    if kind:
+        query = query.filter(models.Job.kind == kind)
+    return query.order_by(models.Job.id.desc()).limit(limit).all()
+
+
+def _claim(job_id: int) -> bool:
+    """queued -> running 的条件更新；其他进程已领取（或任务已结束）时返回 False"""
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        claimed = db.execute(
+            update(models.Job)
+            .where(models.Job.id == job_id, models.Job.status == "queued")
+            .values(status="running", started_at=now, heartbeat_at=now)
+        ).rowcount
+        db.commit()
+    finally:
+        db.close()
+    return claimed == 1
+
+
+def _heartbeat(job_id: int, stop: threading.Event) -> None:
+    while not stop.wait(JOB_HEARTBEAT_SECONDS):
+        try:
+            _update(job_id, heartbeat_at=datetime.utcnow())
+        except Exception:
+            logger.exception("job %s heartbeat failed", job_id)
+
+
+def run_job(job_id: int) -> None:
+    if not _claim(job_id):
+        return
+    db = SessionLocal()
+    stop = threading.Event()
+    try:
+        job = get_job(db, job_id)
+        fn = _handlers.get(job.kind)
+        if fn is None:
+            _update(job_id, status="failed", error=f"unknown job kind: {job.kind}", finished_at=datetime.utcnow())
+            return
+        params = dict(job.params or {})
+        threading.Thread(target=_heartbeat, args=(job_id, stop), name=f"job-{job_id}-heartbeat", daemon=True).start()
+        try:
+            result = fn(db, JobContext(job_id), params)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.exception("job %s (%s) failed", job_id, job.kind)
+            _update(job_id, status="failed", error=str(e), finished_at=datetime.utcnow())
+            return
+        _update(job_id, status="succeeded", result=result or {}, finished_at=datetime.utcnow())
+    finally:
+        stop.set()
+        db.close()
+
+
+def requeue_stale(stale_seconds: float = JOB_STALE_SECONDS) -> int:
+    """把心跳超过 stale_seconds 未刷新的 running 任务改回 queued，返回数量"""
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_seconds)
+    db = SessionLocal()
+    try:
+        count = db.execute(
+            update(models.Job)
+            .where(
+                models.Job.status == "running",
+                or_(models.Job.heartbeat_at < cutoff, models.Job.heartbeat_at.is_(None)),
+            )
+            .values(status="queued")
+        ).rowcount
+        db.commit()
+    finally:
+        db.close()
+    if count:
+        logger.warning("requeued %d stale running job(s)", count)
+    return count
+
+
+def _worker_loop() -> None:
+    while True:
+        job_id = _queue.get()
+        try:
+            run_job(job_id)
+        except Exception:
+            logger.exception("job worker error on job %s", job_id)
+        finally:
+            _queue.task_done()
+
+
+def start_worker(resume: bool = False) -> None:
+    """启动 worker 线程（幂等）；resume=True 时把心跳超时的 running 任务与全部 queued 任务入队"""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_worker_loop, name="job-worker", daemon=True)
+            _worker.start()
+    if resume:
+        requeue_stale()
+        db = SessionLocal()
+        try:
+            pending = (
+                db.query(models.Job.id)
+                .filter(models.Job.status == "queued")
+                .order_by(models.Job.id)
+                .all()
+            )
+        finally:
+            db.close()
+        for (job_id,) in pending:
+            _queue.put(job_id)
@@ -4,11 +4,18 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.openapi.docs import get_swagger_ui_html
 import os
 
-from app.database import engine, Base
-from app.routes import content, search, utils, importer
+from app.database import engine, async_engine, Base, ensure_schema
+from app.routes import content, search, utils, importer, jobs as jobs_routes
+from app import search_index, rendered, jobs
+from app.compression import CompressionMiddleware
 
 # Create tables
 Base.metadata.create_all(bind=engine)
+ensure_schema()
+# Full-text index (SQLite FTS5), backfilled on first run
+search_index.ensure_index(engine)
+# Pre-rendered detail JSON, backfilled for rows written before it existed
+rendered.ensure_rendered(engine)
 
 app = FastAPI(
     title="简单学机器学习API",
@@ -26,7 +33,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+# gzip/brotli, negotiated via Accept-Encoding
+app.add_middleware(CompressionMiddleware)
 
 # Static
 os.makedirs("app/static/images", exist_ok=True)
@@ -37,6 +47,7 @@ app.include_router(content.router, prefix="/api/v1", tags=["content"])
 app.include_router(search.router, prefix="/api/v1", tags=["search"])
 app.include_router(utils.router, prefix="/api/v1", tags=["utils"])
 app.include_router(importer.router, prefix="/api/v1", tags=["importer"])
+app.include_router(jobs_routes.router, prefix="/api/v1", tags=["jobs"])
 
 # Conditionally include auth module
 if os.getenv("AUTH_MODULE_ENABLED", "0") in ("1", "true", "True", "yes", "on"):
@@ -44,6 +55,17 @@ if os.getenv("AUTH_MODULE_ENABLED", "0") in ("1", "true", "True", "yes", "on"):
     app.include_router(auth_routes.router, prefix="/api/v1/auth", tags=["auth"]) 
 
 
+@app.on_event("startup")
+def start_job_worker():
+    # 后台任务 worker；上次未完成的任务重新入队
+    jobs.start_worker(resume=True)
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
+
 # Re-enable Swagger UI at /docs
 @app.get("/docs")
 async def custom_swagger_ui_html():
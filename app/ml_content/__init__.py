@@ -1 +1,19 @@
-# ML content package
\ No newline at end of file
+# ML content package
+#
+# 生成器依赖 matplotlib/seaborn/sympy/sklearn，导入耗时数秒；
+# 包本身不在导入时加载它们，只读接口与 API 冷启动不受影响。
+import threading
+
+_generator = None
+_generator_lock = threading.Lock()
+
+
+def get_content_generator():
+    """返回进程内共享的 ContentGenerator，首次调用时才导入科学计算栈。"""
+    global _generator
+    if _generator is None:
+        with _generator_lock:
+            if _generator is None:
+                from .content_generator import ContentGenerator
+                _generator = ContentGenerator()
+    return _generator
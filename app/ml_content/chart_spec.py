@@ -0,0 +1,303 @@
+"""
+把 matplotlib Figure 转成前端可直接渲染的 ECharts option（charts_data 中的 JSON 图表描述）。
+
+只覆盖能无损表达的简单图形：折线（含 axhline/axvline 参考线）、少量散点、柱状图/条形图；
+数值量化为 float32 精度（JSON 中最多 9 位有效数字）。
+含等高线、位图、文字标注（如决策树）、填充区域、箭头等的图形返回 None，
+由调用方回退到图片资源（render_chart + store_chart）。
+
+生成的 option 带 "type": "echarts"、"format": "spec" 标记，其余键按 ECharts 语义直接交给 setOption。
+"""
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.collections import PathCollection
+from matplotlib.colors import to_hex, to_rgba
+from matplotlib.container import BarContainer
+from matplotlib.figure import Figure
+
+from .render import DENSE_ELEMENT_COUNT
+
+# 单个图形的数据点上限，超过时图片更合适
+MAX_POINTS = int(os.getenv("CHART_SPEC_MAX_POINTS", str(DENSE_ELEMENT_COUNT)))
+
+_LINE_STYLES = {"-": "solid", "--": "dashed", "-.": "dashed", ":": "dotted"}
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def quantize(values: Sequence[float]) -> List[Optional[float]]:
+    """float32 精度的最短十进制表示；NaN/inf 变为 None（ECharts 视为缺失点）"""
+    arr = np.asarray(values, dtype=np.float64).astype(np.float32)
+    return [float(text) if np.isfinite(v) else None for v, text in zip(arr, arr.astype(str))]
+
+
+def _number(value: float) -> Optional[float]:
+    return quantize([value])[0]
+
+
+def _label(text: str) -> str:
+    # mathtext 标签（$...$）只保留内容
+    return text.replace("$", "").strip()
+
+
+def _series_name(artist) -> Optional[str]:
+    label = artist.get_label()
+    if not label or label.startswith("_"):
+        return None
+    return _label(label)
+
+
+def _color(color) -> Dict[str, Any]:
+    rgba = to_rgba(color)
+    style: Dict[str, Any] = {"color": to_hex(rgba)}
+    if rgba[3] < 1:
+        style["opacity"] = _number(rgba[3])
+    return style
+
+
+def _pairs(xs, ys) -> List[List[Optional[float]]]:
+    return [list(p) for p in zip(quantize(xs), quantize(ys))]
+
+
+def _category_labels(axis) -> Optional[Dict[float, str]]:
+    """坐标轴上带文字刻度（字符串类别或 set_xticklabels）时返回 {位置: 文字}"""
+    labels = {float(pos): _label(tick.get_text()) for pos, tick in zip(axis.get_ticklocs(), axis.get_ticklabels())}
+    if not labels or not any(labels.values()):
+        return None
+    try:
+        [float(text.replace("−", "-")) for text in labels.values()]
+        return None  # 普通数值刻度
+    except ValueError:
+        return labels
+
+
+def _value_axis(ax: Axes, which: str, index: int) -> Dict[str, Any]:
+    axis = ax.xaxis if which == "x" else ax.yaxis
+    spec: Dict[str, Any] = {
+        "type": "log" if axis.get_scale() == "log" else "value",
+        "gridIndex": index,
+        "splitLine": {"show": any(line.get_visible() for line in axis.get_gridlines())},
+    }
+    # 自动范围交给 ECharts 取整刻度，只保留显式设置的 xlim/ylim
+    if not (ax.get_autoscalex_on() if which == "x" else ax.get_autoscaley_on()):
+        lo, hi = sorted(ax.get_xlim() if which == "x" else ax.get_ylim())
+        spec.update(min=_number(lo), max=_number(hi))
+    name = _label(axis.get_label_text())
+    if name:
+        spec["name"] = name
+        spec["nameLocation"] = "middle"
+        spec["nameGap"] = 28 if which == "x" else 40
+    return spec
+
+
+def _category_axis(ax: Axes, which: str, index: int, labels: List[str]) -> Dict[str, Any]:
+    axis = ax.xaxis if which == "x" else ax.yaxis
+    spec: Dict[str, Any] = {"type": "category", "gridIndex": index, "data": labels}
+    ticks = axis.get_ticklabels()
+    rotation = ticks[0].get_rotation() if ticks else 0
+    if rotation:
+        spec["axisLabel"] = {"rotate": rotation}
+    name = _label(axis.get_label_text())
+    if name:
+        spec["name"] = name
+    return spec
+
+
+def _bars(ax: Axes, index: int, axes_spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    series: List[Dict[str, Any]] = []
+    for container in ax.containers:
+        if not isinstance(container, BarContainer):
+            raise _Unsupported("non-bar container")
+        horizontal = container.orientation == "horizontal"
+        rects = container.patches
+        if horizontal:
+            positions = [r.get_y() + r.get_height() / 2 for r in rects]
+            values = [r.get_width() for r in rects]
+        else:
+            positions = [r.get_x() + r.get_width() / 2 for r in rects]
+            values = [r.get_height() for r in rects]
+        cat_axis, val_axis = ("y", "x") if horizontal else ("x", "y")
+        categories = _category_labels(ax.yaxis if horizontal else ax.xaxis)
+        item: Dict[str, Any] = {"type": "bar", "xAxisIndex": index, "yAxisIndex": index}
+        if categories and all(round(p, 6) in {round(k, 6) for k in categories} for p in positions):
+            by_pos = {round(k, 6): v for k, v in categories.items()}
+            axes_spec[cat_axis] = _category_axis(ax, cat_axis, index, [by_pos[round(p, 6)] for p in positions])
+            item["data"] = quantize(values)
+        else:
+            item["data"] = _pairs(values, positions) if horizontal else _pairs(positions, values)
+        axes_spec.setdefault(val_axis, _value_axis(ax, val_axis, index))
+        name = _series_name(container)
+        if name:
+            item["name"] = name
+        if rects:
+            item["itemStyle"] = _color(rects[0].get_facecolor())
+        series.append(item)
+    return series
+
+
+def _lines(ax: Axes, index: int) -> List[Dict[str, Any]]:
+    series: List[Dict[str, Any]] = []
+    for line in ax.get_lines():
+        if not line.get_visible():
+            continue
+        style = _color(line.get_color())
+        line_type = _LINE_STYLES.get(line.get_linestyle())
+        transform = line.get_transform()
+        if transform is ax.get_yaxis_transform(which="grid") or transform is ax.get_xaxis_transform(which="grid"):
+            # axhline / axvline：以 markLine 表示
+            horizontal = transform is ax.get_yaxis_transform(which="grid")
+            value = _number(line.get_ydata()[0] if horizontal else line.get_xdata()[0])
+            series.append({
+                "type": "line",
+                "xAxisIndex": index,
+                "yAxisIndex": index,
+                "data": [],
+                "markLine": {
+                    "silent": True,
+                    "symbol": "none",
+                    "label": {"show": False},
+                    "lineStyle": {**style, "type": line_type or "solid"},
+                    "data": [{"yAxis" if horizontal else "xAxis": value}],
+                },
+            })
+            continue
+        if transform is not ax.transData:
+            raise _Unsupported("line outside data coordinates")
+        item: Dict[str, Any] = {
+            "xAxisIndex": index,
+            "yAxisIndex": index,
+            "data": _pairs(line.get_xdata(), line.get_ydata()),
+        }
+        if line_type is None:
+            item.update(type="scatter", itemStyle=style, symbolSize=max(2, round(line.get_markersize())))
+        else:
+            item.update(type="line", showSymbol=line.get_marker() not in (None, "None", "", " "),
+                        lineStyle={**style, "type": line_type, "width": _number(line.get_linewidth())}, itemStyle=style)
+        name = _series_name(line)
+        if name:
+            item["name"] = name
+        series.append(item)
+    return series
+
+
+def _scatters(ax: Axes, index: int) -> List[Dict[str, Any]]:
+    series: List[Dict[str, Any]] = []
+    for collection in ax.collections:
+        if type(collection) is not PathCollection or collection.get_offset_transform() is not ax.transData:
+            raise _Unsupported(type(collection).__name__)
+        offsets = np.asarray(collection.get_offsets(), dtype=np.float64)
+        if not len(offsets):
+            continue
+        colors = collection.get_facecolors()
+        sizes = collection.get_sizes()
+        size = max(2, round(float(np.sqrt(sizes[0])))) if len(sizes) else 6
+        name = _series_name(collection)
+        # 按颜色分组（c=类别 的散点图映射为每类一个系列）
+        keys = [to_hex(c, keep_alpha=True) for c in colors] if len(colors) == len(offsets) else [None] * len(offsets)
+        default = colors[0] if len(colors) else "C0"
+        for key in dict.fromkeys(keys):
+            mask = np.array([k == key for k in keys])
+            item: Dict[str, Any] = {
+                "type": "scatter",
+                "xAxisIndex": index,
+                "yAxisIndex": index,
+                "symbolSize": size,
+                "itemStyle": _color(key or default),
+                "data": _pairs(offsets[mask, 0], offsets[mask, 1]),
+            }
+            if name:
+                item["name"] = name
+            series.append(item)
+    return series
+
+
+def _check_supported(fig: Figure) -> None:
+    suptitle = getattr(fig, "_suptitle", None)
+    if any(t is not suptitle for t in fig.texts) or fig.images or fig.patches or fig.lines:
+        raise _Unsupported("figure-level artists")
+    boxes = set()
+    for ax in fig.axes:
+        if ax.images or ax.texts or ax.tables or ax.artists or ax.child_axes:
+            raise _Unsupported("images or annotations")
+        bar_patches = {id(p) for c in ax.containers for p in c.patches}
+        if any(id(p) not in bar_patches for p in ax.patches):
+            raise _Unsupported("patches")
+        # twinx/twiny 等共用区域的坐标轴无法映射到独立 grid
+        box = tuple(np.round(ax.get_position().bounds, 4))
+        if box in boxes:
+            raise _Unsupported("overlapping axes")
+        boxes.add(box)
+
+
+def _grid(ax: Axes, single: bool) -> Dict[str, Any]:
+    if single:
+        return {"containLabel": True, "left": "3%", "right": "4%", "top": 40, "bottom": 30}
+    x0, y0, width, height = ax.get_position().bounds
+    return {
+        "containLabel": True,
+        "left": f"{x0 * 100:.1f}%",
+        "top": f"{(1 - y0 - height) * 100:.1f}%",
+        "width": f"{width * 100:.1f}%",
+        "height": f"{height * 100:.1f}%",
+    }
+
+
+def _build(fig: Figure) -> Dict[str, Any]:
+    _check_supported(fig)
+    axes_list = [ax for ax in fig.axes if ax.get_visible()]
+    single = len(axes_list) == 1
+    grids, x_axes, y_axes, titles, series = [], [], [], [], []
+    has_legend = False
+    for index, ax in enumerate(axes_list):
+        axes_spec: Dict[str, Any] = {}
+        ax_series = _bars(ax, index, axes_spec) + _lines(ax, index) + _scatters(ax, index)
+        if "x" in axes_spec and axes_spec["x"]["type"] == "category" or "y" in axes_spec and axes_spec["y"]["type"] == "category":
+            if any(s["type"] != "bar" for s in ax_series):
+                raise _Unsupported("mixed category axes")
+        grids.append(_grid(ax, single))
+        x_axes.append(axes_spec.get("x") or _value_axis(ax, "x", index))
+        y_axes.append(axes_spec.get("y") or _value_axis(ax, "y", index))
+        series += ax_series
+        has_legend = has_legend or ax.get_legend() is not None
+        title = _label(ax.get_title())
+        if title:
+            x0, y0, width, height = ax.get_position().bounds
+            titles.append({
+                "text": title,
+                "left": "center" if single else f"{(x0 + width / 2) * 100:.1f}%",
+                "top": 0 if single else f"{max(0.0, (1 - y0 - height) * 100 - 8):.1f}%",
+                "textAlign": None if single else "center",
+                "textStyle": {"fontSize": 13},
+            })
+    if sum(len(s["data"]) for s in series) > MAX_POINTS:
+        raise _Unsupported("too many points")
+    suptitle = getattr(fig, "_suptitle", None)
+    if suptitle is not None and suptitle.get_text():
+        titles.insert(0, {"text": _label(suptitle.get_text()), "left": "center", "top": 0})
+    option: Dict[str, Any] = {
+        "type": "echarts",
+        "format": "spec",
+        "title": [{k: v for k, v in t.items() if v is not None} for t in titles],
+        "tooltip": {"trigger": "axis"} if all(s["type"] == "line" for s in series) else {},
+        "grid": grids,
+        "xAxis": x_axes,
+        "yAxis": y_axes,
+        "series": series,
+    }
+    names = list(dict.fromkeys(s["name"] for s in series if s.get("name")))
+    if has_legend and names:
+        option["legend"] = {"data": names, "bottom": 0}
+    return option
+
+
+def figure_spec(fig: Figure) -> Optional[Dict[str, Any]]:
+    """Figure 对应的 ECharts option；含无法表达的元素时返回 None"""
+    try:
+        return _build(fig)
+    except (_Unsupported, TypeError, ValueError):
+        return None
@@ -1,28 +1,49 @@
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from io import BytesIO
 import base64
-from typing import Dict, Any
+from functools import partial
+from typing import Dict, Any, Callable, Optional
 from .math_content import MathContentGenerator
 from .ml_content import MLContentGenerator
+from .generation_cache import GenerationCache, method_version
+from .render import DEFAULT_CHART_FORMAT, figure, render_png
 
 
 class ContentGenerator:
-    def __init__(self):
-        self.math_generator = MathContentGenerator()
-        self.ml_generator = MLContentGenerator()
-
-    def generate_content(self, module: str, subcategory: str, title: str) -> Dict[str, Any]:
+    def __init__(self, cache: Optional[GenerationCache] = None, use_cache: bool = True, chart_format: Optional[str] = None):
+        self.chart_format = chart_format or DEFAULT_CHART_FORMAT
+        self.math_generator = MathContentGenerator(chart_format=self.chart_format)
+        self.ml_generator = MLContentGenerator(chart_format=self.chart_format)
+        self.cache = (cache or GenerationCache()) if use_cache else None
+
+    def resolve(self, module: str, subcategory: str, title: str) -> Callable[[], Dict[str, Any]]:
+        """返回负责生成该主题的无参可调用对象"""
         if module == "math":
-            return self.math_generator.generate_math_content(subcategory, title)
+            return self.math_generator.resolve_math_method(subcategory, title)
         elif module == "ml":
-            return self.ml_generator.generate_ml_content(subcategory, title)
+            return self.ml_generator.resolve_ml_method(subcategory, title)
         elif module == "dl":
-            return self._generate_dl_content(subcategory, title)
+            return partial(self._generate_dl_content, subcategory, title)
         else:
-            return self._generate_default_content()
+            return self._generate_default_content
+
+    def _version(self, method: Callable[[], Dict[str, Any]]) -> str:
+        # 图表格式不同，生成结果（charts_data 引用）也不同
+        return f"{method_version(method)}:{self.chart_format}"
+
+    def cache_key(self, module: str, subcategory: str, title: str) -> str:
+        return GenerationCache.make_key(module, subcategory, title, self._version(self.resolve(module, subcategory, title)))
+
+    def generate_content(self, module: str, subcategory: str, title: str) -> Dict[str, Any]:
+        method = self.resolve(module, subcategory, title)
+        if self.cache is None:
+            return method()
+        key = GenerationCache.make_key(module, subcategory, title, self._version(method))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        generated = method()
+        self.cache.put(key, generated)
+        return generated
 
     def _generate_dl_content(self, subcategory: str, title: str) -> Dict[str, Any]:
         return {
@@ -101,21 +122,17 @@ class _LegacyMathContentGenerator:
         }
 
     def _create_vector_visualization(self) -> Dict[str, Any]:
-        fig, ax = plt.subplots(figsize=(6, 4))
         vectors = np.array([[0, 0, 2, 3], [0, 0, 3, 1], [0, 0, 1, 4]])
-        for v in vectors:
-            ax.arrow(v[0], v[1], v[2], v[3], head_width=0.1, head_length=0.15, fc='blue', ec='blue')
-        ax.set_xlim(-1, 5)
-        ax.set_ylim(-1, 5)
-        ax.set_xlabel('X轴')
-        ax.set_ylabel('Y轴')
-        ax.set_title('向量可视化')
-        ax.grid(True)
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=100)
-        buffer.seek(0)
-        img_str = base64.b64encode(buffer.read()).decode()
-        plt.close()
+        with figure(figsize=(6, 4)) as (fig, ax):
+            for v in vectors:
+                ax.arrow(v[0], v[1], v[2], v[3], head_width=0.1, head_length=0.15, fc='blue', ec='blue')
+            ax.set_xlim(-1, 5)
+            ax.set_ylim(-1, 5)
+            ax.set_xlabel('X轴')
+            ax.set_ylabel('Y轴')
+            ax.set_title('向量可视化')
+            ax.grid(True)
+            img_str = base64.b64encode(render_png(fig, dpi=100)).decode()
         return {
             "type": "matplotlib",
             "data": img_str,
@@ -0,0 +1,148 @@
+"""
+进程内共享的数据集与已训练模型缓存。
+
+ML 生成器反复使用 iris / diabetes 的同几份切片：数据集只加载一次（sklearn 每次 load_* 都会重新解析 CSV），
+标准化结果与 train/test 划分按 (视图, test_size, seed) 记忆，已训练模型按 (模型类, 超参数, 训练数据) 缓存，
+一次完整的 ML 内容重新生成中每个模型只训练一次。
+
+返回的数组均为只读；返回的模型由各调用方共享，只能用于 predict 等只读操作，不要再次 fit。
+"""
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sklearn.datasets import load_diabetes, load_iris
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+_LOADERS: Dict[str, Callable[[], Any]] = {
+    "iris": load_iris,
+    "diabetes": load_diabetes,
+}
+
+
+class Dataset(NamedTuple):
+    data: np.ndarray
+    target: np.ndarray
+    feature_names: Tuple[str, ...]
+    target_names: Tuple[str, ...]
+
+
+class Split(NamedTuple):
+    X_train: np.ndarray
+    X_test: np.ndarray
+    y_train: np.ndarray
+    y_test: np.ndarray
+
+
+@dataclass(frozen=True)
+class View:
+    """数据集的一个切片：前 rows 行、指定列，scaled 为 True 时做标准化（在整个切片上拟合）"""
+    name: str
+    rows: Optional[int] = None
+    columns: Optional[Tuple[int, ...]] = None
+    scaled: bool = False
+
+
+_memo: Dict[Hashable, Any] = {}
+_key_locks: Dict[Hashable, threading.Lock] = {}
+_lock = threading.Lock()
+
+
+def _memoized(key: Hashable, compute: Callable[[], Any]) -> Any:
+    """按 key 计算一次；同一 key 的并发调用等待首个计算完成，不同 key 互不阻塞"""
+    try:
+        return _memo[key]
+    except KeyError:
+        pass
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        if key not in _memo:
+            _memo[key] = compute()
+        return _memo[key]
+
+
+def _readonly(arr) -> np.ndarray:
+    arr = np.array(arr)
+    arr.setflags(write=False)
+    return arr
+
+
+def load(name: str) -> Dataset:
+    """整个数据集（只读数组）"""
+    if name not in _LOADERS:
+        raise KeyError(f"unknown dataset: {name}")
+
+    def compute() -> Dataset:
+        bunch = _LOADERS[name]()
+        return Dataset(
+            data=_readonly(bunch.data),
+            target=_readonly(bunch.target),
+            feature_names=tuple(bunch.feature_names),
+            target_names=tuple(getattr(bunch, "target_names", ())),
+        )
+
+    return _memoized(("dataset", name), compute)
+
+
+def scaler(view: View) -> StandardScaler:
+    """在视图（未标准化）数据上拟合的 StandardScaler"""
+    raw = View(view.name, view.rows, view.columns)
+    return _memoized(("scaler", raw), lambda: StandardScaler().fit(arrays(raw)[0]))
+
+
+def arrays(view: View) -> Tuple[np.ndarray, np.ndarray]:
+    """视图对应的 (X, y)"""
+
+    def compute() -> Tuple[np.ndarray, np.ndarray]:
+        dataset = load(view.name)
+        rows = slice(None) if view.rows is None else slice(view.rows)
+        X = dataset.data[rows]
+        if view.columns is not None:
+            X = X[:, list(view.columns)]
+        if view.scaled:
+            X = scaler(view).transform(X)
+        return _readonly(X), dataset.target[rows]
+
+    return _memoized(("arrays", view), compute)
+
+
+def split(view: View, test_size: float = 0.3, seed: int = 42) -> Split:
+    """视图的 train/test 划分（同 train_test_split(..., random_state=seed)）"""
+
+    def compute() -> Split:
+        X, y = arrays(view)
+        return Split(*(_readonly(part) for part in train_test_split(X, y, test_size=test_size, random_state=seed)))
+
+    return _memoized(("split", view, test_size, seed), compute)
+
+
+def _freeze(params: Dict[str, Any]) -> Tuple:
+    return tuple(sorted(params.items()))
+
+
+def fitted(estimator_cls: type, view: View, test_size: Optional[float] = None, seed: int = 42, **params: Any):
+    """在视图数据上训练好的 estimator_cls(**params)。
+
+    test_size 为 None 时在整个视图上训练，否则在 split(view, test_size, seed) 的训练集上训练。
+    """
+    key = ("model", estimator_cls, _freeze(params), view, test_size, seed)
+
+    def compute():
+        if test_size is None:
+            X, y = arrays(view)
+        else:
+            parts = split(view, test_size, seed)
+            X, y = parts.X_train, parts.y_train
+        return estimator_cls(**params).fit(X, y)
+
+    return _memoized(key, compute)
+
+
+def clear() -> None:
+    """丢弃全部缓存的数据集与模型（测试或释放内存用）"""
+    with _lock:
+        _memo.clear()
+        _key_locks.clear()
@@ -0,0 +1,116 @@
+"""
+内容生成结果缓存：内存 LRU + 磁盘 JSON 持久化。
+
+键为 (module, subcategory, title, 生成器版本) 的哈希，其中生成器版本由负责该主题的
+生成方法源码计算得到——只有修改了对应方法（或提升 GENERATOR_VERSION）才会使旧条目失效，
+未变化的主题再次生成时直接命中缓存，不再运行 sklearn/matplotlib。
+"""
+import copy
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from app import assets
+
+# 共享工具（图表落盘、公式结构等）变更时手动提升，使全部条目失效
+GENERATOR_VERSION = "1"
+
+DEFAULT_CACHE_DIR = os.getenv("CONTENT_CACHE_DIR", "./.content_cache")
+DEFAULT_MEMORY_ENTRIES = int(os.getenv("CONTENT_CACHE_MEMORY_ENTRIES", "128"))
+
+
+@lru_cache(maxsize=None)
+def _source_digest(func: Callable) -> str:
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = getattr(func, "__qualname__", repr(func))
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+def method_version(method: Callable) -> str:
+    """生成方法的版本号：全局版本 + 方法源码摘要。"""
+    func = getattr(method, "func", method)  # functools.partial
+    func = getattr(func, "__func__", func)
+    return f"{GENERATOR_VERSION}:{func.__qualname__}:{_source_digest(func)}"
+
+
+def _assets_present(result: Dict[str, Any]) -> bool:
+    """缓存结果引用的图片资源仍在磁盘上（资源目录被清理时视为未命中）。"""
+    charts = result.get("charts_data")
+    if not isinstance(charts, dict):
+        return True
+    for value in charts.values():
+        if isinstance(value, dict) and value.get("type") == "image" and value.get("hash"):
+            if assets.find_asset(value["hash"]) is None:
+                return False
+    return True
+
+
+class GenerationCache:
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR, max_entries: int = DEFAULT_MEMORY_ENTRIES):
+        # cache_dir 为 None 时只使用内存
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(module: str, subcategory: str, title: str, version: str) -> str:
+        raw = json.dumps([module, subcategory, title, version], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+        if value is None and self.cache_dir:
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as f:
+                    value = json.load(f)
+            except (OSError, ValueError):
+                value = None
+            if value is not None:
+                self._remember(key, value)
+        if value is None or not _assets_present(value):
+            return None
+        # 返回副本，避免调用方修改缓存内容
+        return copy.deepcopy(value)
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        value = copy.deepcopy(value)
+        self._remember(key, value)
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
@@ -1,20 +1,21 @@
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 import sympy as sp
-from io import BytesIO
-import base64
 import math
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
 import logging
 
+from app.assets import store_chart
+from .chart_spec import figure_spec
+from .render import DEFAULT_CHART_FORMAT, figure, render_chart
+
 logger = logging.getLogger(__name__)
 
 
 class MathContentGenerator:
-    def __init__(self):
+    def __init__(self, chart_format: Optional[str] = None):
         self.x, self.y, self.z = sp.symbols('x y z')
+        # png / svg / auto（见 render.render_chart）
+        self.chart_format = chart_format or DEFAULT_CHART_FORMAT
 
     # 统一公式结构：latex/explanation/symbols
     def _formula(self, latex: str, explanation: str = "", symbols: Dict[str, str] = None) -> Dict[str, Any]:
@@ -26,6 +27,10 @@ class MathContentGenerator:
 
     def generate_math_content(self, subcategory: str, title: str) -> Dict[str, Any]:
         """根据子分类和标题生成数学内容"""
+        return self.resolve_math_method(subcategory, title)()
+
+    def resolve_math_method(self, subcategory: str, title: str) -> Callable[[], Dict[str, Any]]:
+        """返回负责生成该主题的方法（不执行），便于缓存按方法源码区分版本"""
         content_methods = {
             # 基础概念
             "常量": self._generate_constant_content,
@@ -72,25 +77,27 @@ class MathContentGenerator:
         for key, method in sorted(content_methods.items(), key=lambda kv: len(kv[0]), reverse=True):
             for t in texts:
                 if t == key:
-                    return method()
+                    return method
 
         # 其次进行包含匹配（按关键字长度降序），确保更具体的词优先
         for key, method in sorted(content_methods.items(), key=lambda kv: len(kv[0]), reverse=True):
             for t in texts:
                 if key in t:
-                    return method()
+                    return method
 
         # 默认内容
-        return self._generate_default_content()
+        return self._generate_default_content
 
-    def _create_chart_base64(self, fig) -> str:
-        """将matplotlib图表转换为base64字符串"""
-        buffer = BytesIO()
-        fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-        buffer.seek(0)
-        img_str = base64.b64encode(buffer.read()).decode()
-        plt.close(fig)
-        return img_str
+    def _create_chart(self, fig, fmt: Optional[str] = None) -> Dict[str, Any]:
+        """将matplotlib图表写入资源存储，返回 charts_data 引用（format 为实际输出格式）；
+        fmt 覆盖生成器的默认格式，spec 时能用 JSON 描述的图形直接返回 ECharts option"""
+        fmt = fmt or self.chart_format
+        if fmt == "spec":
+            spec = figure_spec(fig)
+            if spec is not None:
+                return spec
+        data, chosen = render_chart(fig, fmt, dpi=100)
+        return store_chart(data, chosen)
 
     # 基础概念
     def _generate_constant_content(self) -> Dict[str, Any]:
@@ -205,16 +212,16 @@ class MathContentGenerator:
             "\nimport math\n"
             "print(2 ** 3)\nprint(5 ** 2)\nprint(math.pow(2, 3))\n"
         )
-        fig, ax = plt.subplots(figsize=(8, 5))
-        x = np.linspace(0, 5, 100)
-        y1 = x ** 2
-        y2 = x ** 3
-        y3 = 2 ** x
-        ax.plot(x, y1, label='$y = x^2$')
-        ax.plot(x, y2, label='$y = x^3$')
-        ax.plot(x, y3, label='$y = 2^x$')
-        ax.legend(); ax.grid(True); ax.set_title('幂函数图像')
-        chart_data = self._create_chart_base64(fig)
+        with figure(figsize=(8, 5)) as (fig, ax):
+            x = np.linspace(0, 5, 100)
+            y1 = x ** 2
+            y2 = x ** 3
+            y3 = 2 ** x
+            ax.plot(x, y1, label='$y = x^2$')
+            ax.plot(x, y2, label='$y = x^3$')
+            ax.plot(x, y3, label='$y = 2^x$')
+            ax.legend(); ax.grid(True); ax.set_title('幂函数图像')
+            chart_data = self._create_chart(fig)
         return {
             "content_body": content_body,
             "python_code": python_code,
@@ -242,13 +249,13 @@ class MathContentGenerator:
             "\nimport math\nimport numpy as np\n"
             "print(math.sqrt(16))\nprint(16 ** 0.5)\n"
         )
-        fig, ax = plt.subplots(figsize=(8, 5))
-        x = np.linspace(0, 10, 100)
-        y = np.sqrt(x)
-        ax.plot(x, y, label='$y = \\sqrt{x}$')
-        ax.fill_between(x, y, alpha=0.2)
-        ax.legend(); ax.grid(True); ax.set_title('平方根函数图像')
-        chart_data = self._create_chart_base64(fig)
+        with figure(figsize=(8, 5)) as (fig, ax):
+            x = np.linspace(0, 10, 100)
+            y = np.sqrt(x)
+            ax.plot(x, y, label='$y = \\sqrt{x}$')
+            ax.fill_between(x, y, alpha=0.2)
+            ax.legend(); ax.grid(True); ax.set_title('平方根函数图像')
+            chart_data = self._create_chart(fig)
         return {
             "content_body": content_body,
             "python_code": python_code,
@@ -273,16 +280,16 @@ class MathContentGenerator:
             "a = np.array([1,2,3]); b = np.array([4,5,6])\n"
             "print('A+B=', a+b); print('A-B=', a-b)\n"
         )
-        fig, ax = plt.subplots(figsize=(8, 6))
-        a = np.array([2, 3])
-        b = np.array([3, 1])
-        ax.quiver(0, 0, a[0], a[1], angles='xy', scale_units='xy', scale=1, color='r', label='A')
-        ax.quiver(0, 0, b[0], b[1], angles='xy', scale_units='xy', scale=1, color='b', label='B')
-        s = a + b
-        ax.quiver(0, 0, s[0], s[1], angles='xy', scale_units='xy', scale=1, color='g', label='A+B')
-        ax.set_xlim(-1, 6); ax.set_ylim(-1, 5); ax.set_aspect('equal')
-        ax.grid(True); ax.legend(); ax.set_title('向量加减法几何意义')
-        chart_data = self._create_chart_base64(fig)
+        with figure(figsize=(8, 6)) as (fig, ax):
+            a = np.array([2, 3])
+            b = np.array([3, 1])
+            ax.quiver(0, 0, a[0], a[1], angles='xy', scale_units='xy', scale=1, color='r', label='A')
+            ax.quiver(0, 0, b[0], b[1], angles='xy', scale_units='xy', scale=1, color='b', label='B')
+            s = a + b
+            ax.quiver(0, 0, s[0], s[1], angles='xy', scale_units='xy', scale=1, color='g', label='A+B')
+            ax.set_xlim(-1, 6); ax.set_ylim(-1, 5); ax.set_aspect('equal')
+            ax.grid(True); ax.legend(); ax.set_title('向量加减法几何意义')
+            chart_data = self._create_chart(fig)
         return {
             "content_body": content_body,
             "python_code": python_code,
@@ -319,16 +326,16 @@ class MathContentGenerator:
             return np.maximum(0, arr)
         def tanh(arr):
             return np.tanh(arr)
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
-        ax1.plot(x, sigmoid(x), label='Sigmoid')
-        ax1.plot(x, relu(x), label='ReLU')
-        ax1.plot(x, tanh(x), label='Tanh')
-        ax1.grid(True); ax1.legend(); ax1.set_title('常用激活函数')
-        sig = sigmoid(x)
-        ax2.plot(x, sig*(1-sig), label='Sigmoid导数', color='red')
-        ax2.plot(x, sig, label='Sigmoid', color='blue')
-        ax2.grid(True); ax2.legend(); ax2.set_title('Sigmoid及其导数')
-        chart_data = self._create_chart_base64(fig)
+        with figure(1, 2, figsize=(14, 5)) as (fig, (ax1, ax2)):
+            ax1.plot(x, sigmoid(x), label='Sigmoid')
+            ax1.plot(x, relu(x), label='ReLU')
+            ax1.plot(x, tanh(x), label='Tanh')
+            ax1.grid(True); ax1.legend(); ax1.set_title('常用激活函数')
+            sig = sigmoid(x)
+            ax2.plot(x, sig*(1-sig), label='Sigmoid导数', color='red')
+            ax2.plot(x, sig, label='Sigmoid', color='blue')
+            ax2.grid(True); ax2.legend(); ax2.set_title('Sigmoid及其导数')
+            chart_data = self._create_chart(fig)
         return {
             "content_body": content_body,
             "python_code": python_code,
@@ -1,35 +1,39 @@
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib import colormaps
 import seaborn as sns
-from sklearn.datasets import load_iris, load_diabetes
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, confusion_matrix, classification_report, mean_squared_error, r2_score
 from sklearn.linear_model import LinearRegression, LogisticRegression
 from sklearn.tree import DecisionTreeClassifier, plot_tree
-from sklearn.preprocessing import StandardScaler
 from sklearn.svm import SVC
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.naive_bayes import GaussianNB
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 
-from io import BytesIO
-import base64
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
 import logging
 
+from app.assets import store_chart
+from . import datasets
+from .chart_spec import figure_spec
+from .render import DEFAULT_CHART_FORMAT, figure, render_chart
+
 logger = logging.getLogger(__name__)
 
 
 class MLContentGenerator:
     """机器学习模块（算法理论与实践）内容生成器"""
 
-    def __init__(self):
-        # 使用与 seaborn v0.13 兼容的样式名
-        plt.style.use('seaborn-v0_8')
+    def __init__(self, chart_format: Optional[str] = None):
         np.random.seed(42)
+        # png / svg / auto（见 render.render_chart）；等高线等密集图在 auto 下始终为 PNG
+        self.chart_format = chart_format or DEFAULT_CHART_FORMAT
 
     def generate_ml_content(self, subcategory: str, title: str) -> Dict[str, Any]:
         """根据子分类与标题生成ML内容"""
+        return self.resolve_ml_method(subcategory, title)()
+
+    def resolve_ml_method(self, subcategory: str, title: str) -> Callable[[], Dict[str, Any]]:
+        """返回负责生成该主题的方法（不执行）"""
         mapping = {
             # 回归算法
             "线性回归": self._generate_linear_regression_content,
@@ -45,17 +49,18 @@ class MLContentGenerator:
 
         for key, fn in mapping.items():
             if key in subcategory or key in title:
-                return fn()
-        return self._generate_default_content()
+                return fn
+        return self._generate_default_content
 
     # =============== 工具方法 ===============
-    def _fig_to_base64(self, fig) -> str:
-        buf = BytesIO()
-        fig.savefig(buf, format='png', dpi=110, bbox_inches='tight')
-        buf.seek(0)
-        img = base64.b64encode(buf.read()).decode()
-        plt.close(fig)
-        return img
+    def _fig_to_chart(self, fig, fmt: Optional[str] = None) -> Dict[str, Any]:
+        fmt = fmt or self.chart_format
+        if fmt == "spec":
+            spec = figure_spec(fig)
+            if spec is not None:
+                return spec
+        data, chosen = render_chart(fig, fmt, dpi=110)
+        return store_chart(data, chosen)
 
     # =============== 具体算法 ===============
     def _generate_linear_regression_content(self) -> Dict[str, Any]:
@@ -90,21 +95,19 @@ class MLContentGenerator:
         )
 
         # 生成图表
-        diabetes = load_diabetes()
-        X_bmi = diabetes.data[:, np.newaxis, 2]
-        y = diabetes.target
-        X_train, X_test, y_train, y_test = train_test_split(X_bmi, y, test_size=0.2, random_state=42)
-        model = LinearRegression().fit(X_train, y_train)
+        bmi = datasets.View("diabetes", columns=(2,))
+        X_train, X_test, y_train, y_test = datasets.split(bmi, test_size=0.2, seed=42)
+        model = datasets.fitted(LinearRegression, bmi, test_size=0.2, seed=42)
         y_pred = model.predict(X_test)
 
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4.5))
-        ax1.scatter(X_test, y_test, alpha=0.6, label='真实')
-        ax1.plot(X_test, y_pred, 'r', label='预测线')
-        ax1.set_title('单变量线性回归'); ax1.legend(); ax1.grid(True, alpha=0.3)
-        res = y_test - y_pred
-        ax2.scatter(y_pred, res, alpha=0.6)
-        ax2.axhline(0, color='r', ls='--'); ax2.set_title('残差图'); ax2.grid(True, alpha=0.3)
-        chart = self._fig_to_base64(fig)
+        with figure(1, 2, figsize=(12, 4.5)) as (fig, (ax1, ax2)):
+            ax1.scatter(X_test, y_test, alpha=0.6, label='真实')
+            ax1.plot(X_test, y_pred, 'r', label='预测线')
+            ax1.set_title('单变量线性回归'); ax1.legend(); ax1.grid(True, alpha=0.3)
+            res = y_test - y_pred
+            ax2.scatter(y_pred, res, alpha=0.6)
+            ax2.axhline(0, color='r', ls='--'); ax2.set_title('残差图'); ax2.grid(True, alpha=0.3)
+            chart = self._fig_to_chart(fig)
 
         return {
             "content_body": content_body,
@@ -152,22 +155,22 @@ class MLContentGenerator:
             "plt.plot(z,s); plt.axvline(0,ls='--'); plt.axhline(0.5,ls='--',c='r'); plt.title('Sigmoid'); plt.show()\n"
         )
 
-        iris = load_iris(); X = iris.data[:100, :2]; y = iris.target[:100]
-        Xs = StandardScaler().fit_transform(X)
-        model = LogisticRegression().fit(Xs, y)
+        binary = datasets.View("iris", rows=100, columns=(0, 1), scaled=True)
+        Xs, y = datasets.arrays(binary)
+        model = datasets.fitted(LogisticRegression, binary)
         # Sigmoid 图
         z = np.linspace(-8, 8, 200); s = 1/(1+np.exp(-z))
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4.5))
         # 决策边界热力背景（简化展示）
         x_min, x_max = Xs[:,0].min()-1, Xs[:,0].max()+1
         y_min, y_max = Xs[:,1].min()-1, Xs[:,1].max()+1
         xx, yy = np.meshgrid(np.linspace(x_min, x_max, 150), np.linspace(y_min, y_max, 150))
         Z = model.predict(np.c_[xx.ravel(), yy.ravel()]).reshape(xx.shape)
-        ax1.contourf(xx, yy, Z, alpha=0.3, cmap=plt.cm.coolwarm)
-        ax1.scatter(Xs[:,0], Xs[:,1], c=y, cmap=plt.cm.coolwarm, edgecolors='k', s=20)
-        ax1.set_title('逻辑回归决策边界'); ax1.grid(True, alpha=0.2)
-        ax2.plot(z, s, 'b'); ax2.axvline(0, ls='--'); ax2.axhline(0.5, ls='--', c='r'); ax2.set_title('Sigmoid')
-        chart = self._fig_to_base64(fig)
+        with figure(1, 2, figsize=(12, 4.5)) as (fig, (ax1, ax2)):
+            ax1.contourf(xx, yy, Z, alpha=0.3, cmap=colormaps['coolwarm'])
+            ax1.scatter(Xs[:,0], Xs[:,1], c=y, cmap=colormaps['coolwarm'], edgecolors='k', s=20)
+            ax1.set_title('逻辑回归决策边界'); ax1.grid(True, alpha=0.2)
+            ax2.plot(z, s, 'b'); ax2.axvline(0, ls='--'); ax2.axhline(0.5, ls='--', c='r'); ax2.set_title('Sigmoid')
+            chart = self._fig_to_chart(fig)
 
         return {
             "content_body": content_body,
@@ -210,15 +213,14 @@ class MLContentGenerator:
             "plt.show()\n"
         )
 
-        iris = load_iris(); X, y = iris.data, iris.target
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
-        model = DecisionTreeClassifier(max_depth=3, random_state=42).fit(X_train, y_train)
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
-        plot_tree(model, feature_names=iris.feature_names, class_names=iris.target_names, filled=True, rounded=True, fontsize=8, ax=ax1)
-        importances = model.feature_importances_
-        ax2.barh(iris.feature_names, importances)
-        ax2.set_title('特征重要性'); ax2.grid(True, alpha=0.3)
-        chart = self._fig_to_base64(fig)
+        iris = datasets.load("iris")
+        model = datasets.fitted(DecisionTreeClassifier, datasets.View("iris"), test_size=0.3, seed=42, max_depth=3, random_state=42)
+        with figure(1, 2, figsize=(16, 6)) as (fig, (ax1, ax2)):
+            plot_tree(model, feature_names=iris.feature_names, class_names=iris.target_names, filled=True, rounded=True, fontsize=8, ax=ax1)
+            importances = model.feature_importances_
+            ax2.barh(iris.feature_names, importances)
+            ax2.set_title('特征重要性'); ax2.grid(True, alpha=0.3)
+            chart = self._fig_to_chart(fig)
 
         return {
             "content_body": content_body,
@@ -263,18 +265,18 @@ class MLContentGenerator:
             "plt.title('SVM 决策边界')\n"
             "plt.show()\n"
         )
-        iris = load_iris(); X = iris.data[:100, :2]; y = iris.target[:100]
-        Xs = StandardScaler().fit_transform(X)
-        clf = SVC(kernel='rbf', gamma='scale', C=1.0).fit(Xs, y)
+        binary = datasets.View("iris", rows=100, columns=(0, 1), scaled=True)
+        Xs, y = datasets.arrays(binary)
+        clf = datasets.fitted(SVC, binary, kernel='rbf', gamma='scale', C=1.0)
         x_min, x_max = Xs[:,0].min()-1, Xs[:,0].max()+1
         y_min, y_max = Xs[:,1].min()-1, Xs[:,1].max()+1
         xx, yy = np.meshgrid(np.linspace(x_min, x_max, 200), np.linspace(y_min, y_max, 200))
         Z = clf.predict(np.c_[xx.ravel(), yy.ravel()]).reshape(xx.shape)
-        fig, ax = plt.subplots(1, 1, figsize=(6, 4.5))
-        ax.contourf(xx, yy, Z, alpha=0.3, cmap=plt.cm.coolwarm)
-        ax.scatter(Xs[:,0], Xs[:,1], c=y, cmap=plt.cm.coolwarm, edgecolors='k', s=20)
-        ax.set_title('SVM 决策边界'); ax.grid(True, alpha=0.2)
-        chart = self._fig_to_base64(fig)
+        with figure(1, 1, figsize=(6, 4.5)) as (fig, ax):
+            ax.contourf(xx, yy, Z, alpha=0.3, cmap=colormaps['coolwarm'])
+            ax.scatter(Xs[:,0], Xs[:,1], c=y, cmap=colormaps['coolwarm'], edgecolors='k', s=20)
+            ax.set_title('SVM 决策边界'); ax.grid(True, alpha=0.2)
+            chart = self._fig_to_chart(fig)
         return {
             "content_body": content_body,
             "python_code": python_code,
@@ -307,18 +309,18 @@ class MLContentGenerator:
             "plt.title('KNN 决策边界')\n"
             "plt.show()\n"
         )
-        iris = load_iris(); X = iris.data[:100, :2]; y = iris.target[:100]
-        Xs = StandardScaler().fit_transform(X)
-        clf = KNeighborsClassifier(n_neighbors=5).fit(Xs, y)
+        binary = datasets.View("iris", rows=100, columns=(0, 1), scaled=True)
+        Xs, y = datasets.arrays(binary)
+        clf = datasets.fitted(KNeighborsClassifier, binary, n_neighbors=5)
         x_min, x_max = Xs[:,0].min()-1, Xs[:,0].max()+1
         y_min, y_max = Xs[:,1].min()-1, Xs[:,1].max()+1
         xx, yy = np.meshgrid(np.linspace(x_min, x_max, 200), np.linspace(y_min, y_max, 200))
         Z = clf.predict(np.c_[xx.ravel(), yy.ravel()]).reshape(xx.shape)
-        fig, ax = plt.subplots(1, 1, figsize=(6, 4.5))
-        ax.contourf(xx, yy, Z, alpha=0.3, cmap=plt.cm.coolwarm)
-        ax.scatter(Xs[:,0], Xs[:,1], c=y, cmap=plt.cm.coolwarm, edgecolors='k', s=20)
-        ax.set_title('KNN 决策边界'); ax.grid(True, alpha=0.2)
-        chart = self._fig_to_base64(fig)
+        with figure(1, 1, figsize=(6, 4.5)) as (fig, ax):
+            ax.contourf(xx, yy, Z, alpha=0.3, cmap=colormaps['coolwarm'])
+            ax.scatter(Xs[:,0], Xs[:,1], c=y, cmap=colormaps['coolwarm'], edgecolors='k', s=20)
+            ax.set_title('KNN 决策边界'); ax.grid(True, alpha=0.2)
+            chart = self._fig_to_chart(fig)
         return {
             "content_body": content_body,
             "python_code": python_code,
@@ -347,15 +349,15 @@ class MLContentGenerator:
             "cm = confusion_matrix(y_test, y_pred)\n"
             "sns.heatmap(cm, annot=True, fmt='d'); plt.title('混淆矩阵'); plt.show()\n"
         )
-        iris = load_iris(); X, y = iris.data, iris.target
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
-        clf = GaussianNB().fit(X_train, y_train)
-        y_pred = clf.predict(X_test)
-        cm = confusion_matrix(y_test, y_pred)
-        fig, ax = plt.subplots(figsize=(5,4))
-        sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', ax=ax)
-        ax.set_title('朴素贝叶斯混淆矩阵')
-        chart = self._fig_to_base64(fig)
+        full = datasets.View("iris")
+        parts = datasets.split(full, test_size=0.3, seed=42)
+        clf = datasets.fitted(GaussianNB, full, test_size=0.3, seed=42)
+        y_pred = clf.predict(parts.X_test)
+        cm = confusion_matrix(parts.y_test, y_pred)
+        with figure(figsize=(5, 4)) as (fig, ax):
+            sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', ax=ax)
+            ax.set_title('朴素贝叶斯混淆矩阵')
+            chart = self._fig_to_chart(fig)
         return {
             "content_body": content_body,
             "python_code": python_code,
@@ -380,16 +382,15 @@ class MLContentGenerator:
             "print('acc=', accuracy_score(y_test, clf.predict(X_test)))\n"
             "plt.bar(range(X.shape[1]), clf.feature_importances_); plt.title('特征重要性'); plt.show()\n"
         )
-        iris = load_iris(); X, y = iris.data, iris.target
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
-        clf = RandomForestClassifier(n_estimators=120, random_state=42).fit(X_train, y_train)
+        iris = datasets.load("iris")
+        clf = datasets.fitted(RandomForestClassifier, datasets.View("iris"), test_size=0.3, seed=42, n_estimators=120, random_state=42)
         importances = clf.feature_importances_
-        fig, ax = plt.subplots(figsize=(6,4))
-        ax.bar(range(X.shape[1]), importances, color='teal')
-        ax.set_xticks(range(X.shape[1]))
-        ax.set_xticklabels(iris.feature_names, rotation=30)
-        ax.set_title('随机森林特征重要性'); ax.grid(True, axis='y', alpha=0.3)
-        chart = self._fig_to_base64(fig)
+        with figure(figsize=(6, 4)) as (fig, ax):
+            ax.bar(range(len(iris.feature_names)), importances, color='teal')
+            ax.set_xticks(range(len(iris.feature_names)))
+            ax.set_xticklabels(iris.feature_names, rotation=30)
+            ax.set_title('随机森林特征重要性'); ax.grid(True, axis='y', alpha=0.3)
+            chart = self._fig_to_chart(fig)
         return {
             "content_body": content_body,
             "python_code": python_code,
@@ -414,16 +415,15 @@ class MLContentGenerator:
             "print('acc=', accuracy_score(y_test, clf.predict(X_test)))\n"
             "plt.bar(range(X.shape[1]), clf.feature_importances_); plt.title('特征重要性'); plt.show()\n"
         )
-        iris = load_iris(); X, y = iris.data, iris.target
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
-        clf = GradientBoostingClassifier(random_state=42).fit(X_train, y_train)
+        iris = datasets.load("iris")
+        clf = datasets.fitted(GradientBoostingClassifier, datasets.View("iris"), test_size=0.3, seed=42, random_state=42)
         importances = clf.feature_importances_
-        fig, ax = plt.subplots(figsize=(6,4))
-        ax.bar(range(X.shape[1]), importances, color='orange')
-        ax.set_xticks(range(X.shape[1]))
-        ax.set_xticklabels(iris.feature_names, rotation=30)
-        ax.set_title('GBDT 特征重要性'); ax.grid(True, axis='y', alpha=0.3)
-        chart = self._fig_to_base64(fig)
+        with figure(figsize=(6, 4)) as (fig, ax):
+            ax.bar(range(len(iris.feature_names)), importances, color='orange')
+            ax.set_xticks(range(len(iris.feature_names)))
+            ax.set_xticklabels(iris.feature_names, rotation=30)
+            ax.set_title('GBDT 特征重要性'); ax.grid(True, axis='y', alpha=0.3)
+            chart = self._fig_to_chart(fig)
         return {
             "content_body": content_body,
             "python_code": python_code,
@@ -0,0 +1,78 @@
+"""
+多进程内容生成引擎。
+
+批量初始化/再生成时，把未命中缓存的 generate_content 调用分发到进程池：
+每个子进程以 spawn 方式启动、使用 Agg 后端并预先导入 sklearn/matplotlib，
+拥有独立的 pyplot 状态；结果按提交顺序回传父进程，由父进程写缓存并批量入库。
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from .content_generator import ContentGenerator
+
+Spec = Tuple[str, str, str]  # (module, subcategory, title)
+
+# 默认进程数：CPU 核数，可通过环境变量覆盖；<=1 时在当前进程内顺序生成
+DEFAULT_WORKERS = int(os.getenv("CONTENT_GEN_WORKERS", str(os.cpu_count() or 1)))
+
+_worker_generator: Optional[ContentGenerator] = None
+
+
+def _init_worker(chart_format: Optional[str] = None) -> None:
+    global _worker_generator
+    import matplotlib
+    matplotlib.use("Agg")
+    # 缓存由父进程统一读写，子进程只负责计算
+    _worker_generator = ContentGenerator(use_cache=False, chart_format=chart_format)
+
+
+def _generate(spec: Spec) -> Dict[str, Any]:
+    return _worker_generator.generate_content(*spec)
+
+
+def generate_many(
+    specs: List[Spec],
+    generator: ContentGenerator,
+    workers: Optional[int] = None,
+) -> Iterator[Tuple[Spec, Dict[str, Any]]]:
+    """按输入顺序产出 (spec, generated)。缓存命中在父进程直接返回，其余分发到进程池。"""
+    workers = DEFAULT_WORKERS if workers is None else workers
+    results: Dict[int, Dict[str, Any]] = {}
+    misses: List[int] = []
+    keys: Dict[int, str] = {}
+    for i, spec in enumerate(specs):
+        if generator.cache is not None:
+            keys[i] = generator.cache_key(*spec)
+            cached = generator.cache.get(keys[i])
+            if cached is not None:
+                results[i] = cached
+                continue
+        misses.append(i)
+
+    if workers <= 1 or len(misses) <= 1:
+        computed = (generator.resolve(*specs[i])() for i in misses)
+        yield from _merge(specs, generator, results, misses, keys, computed)
+        return
+
+    ctx = get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(misses)), mp_context=ctx, initializer=_init_worker, initargs=(generator.chart_format,)) as pool:
+        computed = pool.map(_generate, [specs[i] for i in misses])
+        yield from _merge(specs, generator, results, misses, keys, computed)
+
+
+def _merge(specs, generator, results, misses, keys, computed) -> Iterator[Tuple[Spec, Dict[str, Any]]]:
+    """把缓存命中与新计算结果按原顺序合并，同时回写缓存"""
+    pending = iter(misses)
+    computed = iter(computed)
+    next_miss = next(pending, None)
+    for i, spec in enumerate(specs):
+        if i == next_miss:
+            generated = next(computed)
+            if generator.cache is not None:
+                generator.cache.put(keys[i], generated)
+            next_miss = next(pending, None)
+        else:
+            generated = results[i]
+        yield spec, generated
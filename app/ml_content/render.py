@@ -0,0 +1,120 @@
+"""
+图表渲染层：直接基于 matplotlib.figure.Figure + FigureCanvasAgg，
+不经过 pyplot 的全局图形管理器，图形对象彼此独立，可在线程池中并发生成内容。
+
+唯一的共享状态是 rcParams（样式上下文会临时修改它，绘图与输出时会读取它），
+因此图形的构建与输出在 _RC_LOCK 内完成；数据准备、模型训练等应放在锁外。
+
+输出格式：png、svg（精简后的矢量图），或 auto —— 简单线图通常 SVG 更小且可任意缩放，
+密集的散点/等高线/位图则直接输出 PNG；auto 按压缩后传输大小择优。
+spec 表示输出前端渲染的 JSON 图表描述（见 chart_spec），不支持的图形按 SPEC_FALLBACK_FORMAT 输出图片。
+"""
+import gzip
+import os
+import re
+import threading
+from contextlib import contextmanager, nullcontext
+from io import BytesIO
+from typing import Any, Iterator, Optional, Tuple
+
+import matplotlib
+import matplotlib.style
+from matplotlib.contour import ContourSet
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+_RC_LOCK = threading.RLock()
+
+# 全部图表统一使用的样式（与 seaborn v0.13 兼容的样式名）
+DEFAULT_STYLE = "seaborn-v0_8"
+
+CHART_FORMATS = ("png", "svg", "auto", "spec")
+DEFAULT_CHART_FORMAT = os.getenv("CHART_FORMAT", "auto")
+# spec 模式下等高线、决策树等无法用 JSON 描述的图形使用的图片格式
+SPEC_FALLBACK_FORMAT = os.getenv("CHART_SPEC_FALLBACK_FORMAT", "png")
+# 超过该数量的散点/网格单元视为密集图，不尝试 SVG
+DENSE_ELEMENT_COUNT = int(os.getenv("CHART_SVG_MAX_ELEMENTS", "2000"))
+
+_SVG_RC = {
+    # 文字保留为 <text>（不转成字形路径），体积小且可选中
+    "svg.fonttype": "none",
+    # 固定 id 前缀，相同图形得到相同字节（资源按内容去重）
+    "svg.hashsalt": "chart",
+    "path.simplify": True,
+    "path.simplify_threshold": float(os.getenv("CHART_SVG_SIMPLIFY_THRESHOLD", "0.5")),
+}
+_SVG_STRIP_RE = re.compile(rb"<!--.*?-->|<metadata>.*?</metadata>", re.DOTALL)
+_SVG_GAP_RE = re.compile(rb">\s+<")
+
+
+@contextmanager
+def figure(
+    nrows: int = 1,
+    ncols: int = 1,
+    *,
+    figsize: Optional[Tuple[float, float]] = None,
+    style: Optional[str] = DEFAULT_STYLE,
+    **subplots_kw: Any,
+) -> Iterator[Tuple[Figure, Any]]:
+    """创建独立的 Figure 与子图（参数同 plt.subplots），style 为本次绘图使用的样式（None 为 matplotlib 默认样式）。
+
+    用法：
+        with figure(1, 2, figsize=(12, 4)) as (fig, (ax1, ax2)):
+            ax1.plot(...)
+            png = render_png(fig)
+    """
+    with _RC_LOCK:
+        with matplotlib.style.context(style) if style else nullcontext():
+            fig = Figure(figsize=figsize)
+            FigureCanvasAgg(fig)
+            axes = fig.subplots(nrows, ncols, **subplots_kw)
+            yield fig, axes
+
+
+def render_png(fig: Figure, dpi: int = 100) -> bytes:
+    buf = BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    return buf.getvalue()
+
+
+def render_svg(fig: Figure) -> bytes:
+    """精简 SVG：路径简化、文字不转曲，去掉注释/元数据与标签间空白"""
+    buf = BytesIO()
+    with _RC_LOCK, matplotlib.rc_context(_SVG_RC):
+        fig.savefig(buf, format="svg", bbox_inches="tight", metadata={"Date": None})
+    svg = _SVG_STRIP_RE.sub(b"", buf.getvalue())
+    return _SVG_GAP_RE.sub(b"><", svg).strip()
+
+
+def is_dense(fig: Figure) -> bool:
+    """含位图、等高线或大量散点/网格的图形，矢量化只会更大"""
+    for ax in fig.axes:
+        if ax.images:
+            return True
+        for collection in ax.collections:
+            if isinstance(collection, ContourSet):
+                return True
+            if len(collection.get_offsets()) + len(collection.get_paths()) > DENSE_ELEMENT_COUNT:
+                return True
+    return False
+
+
+def render_chart(fig: Figure, fmt: str = DEFAULT_CHART_FORMAT, dpi: int = 100) -> Tuple[bytes, str]:
+    """按 fmt（png / svg / auto）输出图形，返回 (bytes, 实际格式)；spec 按 SPEC_FALLBACK_FORMAT 处理。
+
+    auto：密集图直接 PNG；否则同时渲染两种格式，比较 gzip 后的 SVG 与 PNG 大小
+    （SVG 经压缩中间件传输），取较小者。
+    """
+    if fmt == "spec":
+        fmt = SPEC_FALLBACK_FORMAT
+    if fmt not in CHART_FORMATS or fmt == "spec":
+        raise ValueError(f"unknown chart format: {fmt}")
+    if fmt == "png" or (fmt == "auto" and is_dense(fig)):
+        return render_png(fig, dpi=dpi), "png"
+    svg = render_svg(fig)
+    if fmt == "svg":
+        return svg, "svg"
+    png = render_png(fig, dpi=dpi)
+    if len(gzip.compress(svg, compresslevel=6)) < len(png):
+        return svg, "svg"
+    return png, "png"
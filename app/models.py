@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, LargeBinary, func
 from sqlalchemy.types import JSON
 from datetime import datetime
 
@@ -17,8 +17,28 @@ class Content(Base):
     formulas = Column(JSON)
     charts_data = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # 索引：列表 ETag 需要 max(updated_at)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     tags = Column(JSON)
+    # Markdown 导入来源（原文 + 引用图片）的 sha256；内容未变化时重复导入直接跳过，非导入写入时为空
+    source_hash = Column(String(64))
+
+    __table_args__ = (
+        # 列表排序/keyset 分页键（NULL 按空字符串排序，见 crud.list_order_key）
+        Index("ix_content_list_order", func.coalesce(module, ""), func.coalesce(subcategory, ""), id),
+    )
+
+
+class ContentRendered(Base):
+    """详情接口的预渲染结果：schemas.Content 的 gzip JSON，随 Content 写入同步更新（见 app.rendered）"""
+    __tablename__ = "content_rendered"
+
+    content_id = Column(Integer, primary_key=True)
+    title = Column(String(200), index=True)
+    updated_at = Column(DateTime)
+    body = Column(LargeBinary)
+    # 未压缩 JSON 的字节数
+    size = Column(Integer)
 
 
 class ContentUpdateLog(Base):
@@ -27,4 +47,24 @@ class ContentUpdateLog(Base):
     id = Column(Integer, primary_key=True)
     update_type = Column(String(50))
     content_count = Column(Integer)
-    updated_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class Job(Base):
+    """后台任务（批量初始化/再生成/导入），由 app.jobs 的进程内 worker 执行"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), index=True)
+    # queued / running / succeeded / failed
+    status = Column(String(20), index=True, default="queued")
+    params = Column(JSON)
+    progress = Column(Integer, default=0)
+    total = Column(Integer, default=0)
+    result = Column(JSON)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    # running 任务的执行进程定期刷新；长时间未刷新视为执行进程已退出（见 jobs.requeue_stale）
+    heartbeat_at = Column(DateTime)
+    finished_at = Column(DateTime)
@@ -0,0 +1,32 @@
+"""
+不透明游标（keyset 分页）。
+
+游标是排序键的 JSON 数组经 base64url 编码后的字符串，客户端只需原样回传；
+列表按 (module, subcategory, id) 排序，搜索按 (rank, id) 排序。
+"""
+import base64
+import json
+from typing import Any, List, Sequence, Tuple, Type, Union
+
+# 游标中每个元素的期望类型，如列表的 (str, str, int)
+CursorTypes = Sequence[Union[Type, Tuple[Type, ...]]]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, types: CursorTypes) -> List[Any]:
+    """解码游标，长度或元素类型与 types 不符、格式错误时抛出 ValueError。"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {e}")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("invalid cursor")
+    # bool 是 int 的子类，JSON 的 true/false 不能当作数字
+    if any(isinstance(v, bool) or not isinstance(v, t) for v, t in zip(values, types)):
+        raise ValueError("invalid cursor")
+    return values
@@ -0,0 +1,138 @@
+"""
+内容详情的预渲染存储。
+
+每条 Content 写入（create/update/import/再生成）时，在同一事务内把 schemas.Content 的 JSON
+gzip 压缩后写入 content_rendered；详情接口直接读取这段字节原样返回（客户端支持 gzip 时
+不解压），跳过 ORM 加载、Pydantic 校验与 JSON 编码。
+通过 ORM 事件同步；绕过 ORM 的批量写入需调用 refresh_rows() 显式刷新。
+"""
+import gzip
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.orm import Session, attributes, object_session
+
+from app import models, schemas
+
+RENDERED = models.ContentRendered.__table__
+GZIP_LEVEL = 6
+
+# id(engine) -> 是否已检查过回填
+_ready: Dict[int, bool] = {}
+# 已确认建表的引擎；导入 CLI 等不经过应用启动的写入路径在首次写入时建表
+_table_ready: Set[int] = set()
+
+
+def render_json(obj: models.Content) -> bytes:
+    return schemas.Content.model_validate(obj).model_dump_json().encode("utf-8")
+
+
+def compress(body: bytes) -> bytes:
+    # mtime=0 使相同内容得到相同字节
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def decompress(body: bytes) -> bytes:
+    return gzip.decompress(body)
+
+
+def _row_params(obj: models.Content) -> dict:
+    body = render_json(obj)
+    return {
+        "content_id": obj.id,
+        "title": obj.title,
+        "updated_at": obj.updated_at,
+        "body": compress(body),
+        "size": len(body),
+    }
+
+
+def _ensure_table(conn) -> None:
+    key = id(conn.engine)
+    if key not in _table_ready:
+        RENDERED.create(conn, checkfirst=True)
+        _table_ready.add(key)
+
+
+def store_row(conn, obj: models.Content) -> None:
+    _ensure_table(conn)
+    conn.execute(delete(RENDERED).where(RENDERED.c.content_id == obj.id))
+    conn.execute(insert(RENDERED), _row_params(obj))
+
+
+def remove_row(conn, content_id: int) -> None:
+    _ensure_table(conn)
+    conn.execute(delete(RENDERED).where(RENDERED.c.content_id == content_id))
+
+
+def refresh_rows(db: Session, content_ids: Iterable[int]) -> int:
+    """按 id 重新渲染（用于绕过 ORM 事件的批量写入），在 db 的当前事务中执行"""
+    ids = list(content_ids)
+    if not ids:
+        return 0
+    conn = db.connection()
+    _ensure_table(conn)
+    objs = db.query(models.Content).filter(models.Content.id.in_(ids)).populate_existing().all()
+    conn.execute(delete(RENDERED).where(RENDERED.c.content_id.in_(ids)))
+    if objs:
+        conn.execute(insert(RENDERED), [_row_params(obj) for obj in objs])
+    return len(objs)
+
+
+def ensure_rendered(bind) -> int:
+    """为缺少预渲染结果或 updated_at 不一致的内容补写，返回补写行数（每个引擎只检查一次）"""
+    engine = getattr(bind, "engine", bind)
+    if _ready.get(id(engine)):
+        return 0
+    RENDERED.create(engine, checkfirst=True)
+    _table_ready.add(id(engine))
+    db = Session(bind=engine)
+    try:
+        stale = (
+            db.query(models.Content.id)
+            .outerjoin(models.ContentRendered, models.ContentRendered.content_id == models.Content.id)
+            .filter(
+                (models.ContentRendered.content_id.is_(None))
+                | (models.ContentRendered.updated_at != models.Content.updated_at)
+            )
+            .all()
+        )
+        count = refresh_rows(db, [content_id for (content_id,) in stale])
+        db.commit()
+    finally:
+        db.close()
+    _ready[id(engine)] = True
+    return count
+
+
+def fetch_stmt(content_id: Optional[int] = None, title: Optional[str] = None):
+    stmt = select(RENDERED.c.content_id, RENDERED.c.title, RENDERED.c.updated_at, RENDERED.c.body)
+    if content_id is not None:
+        return stmt.where(RENDERED.c.content_id == content_id)
+    return stmt.where(RENDERED.c.title == title).limit(1)
+
+
+@event.listens_for(models.Content, "after_insert")
+def _content_after_insert(mapper, connection, target):
+    store_row(connection, target)
+
+
+@event.listens_for(models.Content, "before_update")
+def _content_before_update(mapper, connection, target):
+    # 显式写入 updated_at：同一次 flush 更新多行时，after_update 中读到的 onupdate 值
+    # 并不是本行实际写入的时间，预渲染结果的 updated_at 会与 content 表不一致
+    session = object_session(target)
+    if attributes.get_history(target, "updated_at").added or not session.is_modified(target, include_collections=False):
+        return
+    target.updated_at = datetime.utcnow()
+
+
+@event.listens_for(models.Content, "after_update")
+def _content_after_update(mapper, connection, target):
+    store_row(connection, target)
+
+
+@event.listens_for(models.Content, "after_delete")
+def _content_after_delete(mapper, connection, target):
+    remove_row(connection, target.id)
@@ -1,42 +1,122 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 
-from app.database import get_db
-from app import models, schemas, crud
-from app.ml_content.content_generator import ContentGenerator
-from app.init_database import populate_math_contents, populate_ml_contents
+from app.database import get_db, get_async_db
+from app import schemas, crud, crud_async, http_cache, jobs, rendered
+from app.compression import negotiate
+from app.content_cache import content_cache
+from app.pagination import encode_cursor, decode_cursor
+from app.ml_content import get_content_generator
+from app.init_database import populate_math_contents, populate_ml_contents, regenerate_contents
 
 router = APIRouter()
-content_generator = ContentGenerator()
 
 
-@router.get("/content/", response_model=List[schemas.Content])
-def read_content(
+def _resolve_fields(view: Optional[str], fields: Optional[str]) -> Optional[List[str]]:
+    """解析 view/fields 参数，返回需要的列（始终包含 id）；None 表示完整对象。"""
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in selected if f not in crud.CONTENT_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"未知字段: {', '.join(unknown)}")
+        return ["id"] + [f for f in dict.fromkeys(selected) if f != "id"]
+    if view == "summary":
+        return list(crud.SUMMARY_FIELDS)
+    if view not in (None, "full"):
+        raise HTTPException(status_code=400, detail="view 仅支持 full/summary")
+    return None
+
+
+def _rendered_response(request: Request, body: bytes, headers: Optional[dict] = None) -> Response:
+    """返回预渲染的 gzip JSON：客户端接受 gzip（q > 0）时原样发送，否则解压"""
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+    if negotiate(request.headers.get("accept-encoding", ""), ("gzip",)) == "gzip":
+        headers["Content-Encoding"] = "gzip"
+        return Response(body, media_type="application/json", headers=headers)
+    return Response(rendered.decompress(body), media_type="application/json", headers=headers)
+
+
+# 返回值随 view/fields 变化：完整 Content、summary 投影（ContentSummary）或 fields 指定的任意列
+@router.get(
+    "/content/",
+    response_model=None,
+    responses={200: {"model": List[Union[schemas.Content, schemas.ContentSummary, Dict[str, Any]]], "description": "内容列表"}},
+)
+async def read_content(
+    request: Request,
+    response: Response,
     module: Optional[str] = Query(None, description="模块: math/ml/dl"),
     subcategory: Optional[str] = Query(None, description="子分类"),
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    view: Optional[str] = Query(None, description="full(默认)/summary：summary 仅返回 id/module/subcategory/title/tags/updated_at"),
+    fields: Optional[str] = Query(None, description="稀疏字段集，逗号分隔，如 id,title,tags；优先于 view"),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值；提供时忽略 skip"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return crud.get_content(db, module=module, subcategory=subcategory, skip=skip, limit=limit)
+    selected = _resolve_fields(view, fields)
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, crud.LIST_CURSOR_TYPES)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+
+    # 同一查询参数下，筛选范围内无任何写入则结果不变
+    version = await crud_async.content_version(db, module=module, subcategory=subcategory)
+    etag = http_cache.make_etag(http_cache.request_key(request), version)
+    if http_cache.etag_matches(request, etag):
+        return http_cache.not_modified(etag)
+
+    rows = await crud_async.get_content(db, module=module, subcategory=subcategory, skip=skip, limit=limit, fields=selected, after=after)
+    # 满页时返回下一页游标，末页为空
+    next_cursor = encode_cursor(crud.list_cursor(rows[-1])) if rows and len(rows) == limit else ""
+
+    if selected is None:
+        response.headers["X-Next-Cursor"] = next_cursor
+        http_cache.apply(response, etag)
+        return [schemas.Content.model_validate(row) for row in rows]
+    # 投影结果不满足完整 Content 模型，直接返回 JSON
+    return JSONResponse(
+        jsonable_encoder([{f: getattr(row, f) for f in selected} for row in rows]),
+        headers={"X-Next-Cursor": next_cursor, **http_cache.cache_headers(etag)},
+    )
 
 
 @router.get("/content/{content_id}", response_model=schemas.Content)
-def read_content_by_id(content_id: int, db: Session = Depends(get_db)):
-    content = crud.get_content_by_id(db, content_id=content_id)
-    if content is None:
-        raise HTTPException(status_code=404, detail="内容未找到")
-    return content
+async def read_content_by_id(content_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    # 依次查找：进程内缓存 -> content_rendered 预渲染结果 -> ORM（尚未渲染的行）
+    entry = content_cache.get_by_id(content_id)
+    if entry is None:
+        generation = content_cache.generation()
+        row = await crud_async.get_rendered(db, content_id=content_id)
+        if row is not None:
+            entry = content_cache.put_rendered(*row, generation=generation)
+        else:
+            content = await crud_async.get_content_by_id(db, content_id=content_id)
+            if content is None:
+                raise HTTPException(status_code=404, detail="内容未找到")
+            entry = content_cache.put(content, generation)
+    etag = http_cache.make_etag("content", entry.id, entry.updated_at)
+    if http_cache.etag_matches(request, etag):
+        return http_cache.not_modified(etag)
+    return _rendered_response(request, entry.body, http_cache.cache_headers(etag))
 
 
 @router.post("/content/generate/", response_model=schemas.Content)
-def generate_content(request: schemas.GenerateRequest, db: Session = Depends(get_db)):
+def generate_content(request: schemas.GenerateRequest, http_request: Request, db: Session = Depends(get_db)):
+    cached = content_cache.get_by_title(request.title)
+    if cached:
+        return _rendered_response(http_request, cached.body)
     existing_content = crud.get_content_by_title(db, request.title)
     if existing_content:
         return existing_content
 
-    generated_data = content_generator.generate_content(
+    generated_data = get_content_generator().generate_content(
         request.module, request.subcategory, request.title
     )
 
@@ -50,52 +130,47 @@ def generate_content(request: schemas.GenerateRequest, db: Session = Depends(get
     return crud.create_content(db, content_data)
 
 
-@router.post("/content/init_math")
-def init_math_content(db: Session = Depends(get_db)):
-    """批量初始化数学内容，返回新增记录数"""
-    created = populate_math_contents(db, content_generator)
-    return {"status": "ok", "created": created}
-
-
-@router.post("/content/init_ml")
-def init_ml_content(db: Session = Depends(get_db)):
-    """批量初始化机器学习内容，返回新增记录数"""
-    created = populate_ml_contents(db, content_generator)
-    return {"status": "ok", "created": created}
-
-
-@router.post("/content/update/")
-def update_content(request: schemas.ContentUpdateRequest, db: Session = Depends(get_db)):
-    """根据模块/子类批量再生成内容，并更新现有记录（用于结构变更或内容刷新）。"""
-    query = db.query(models.Content)
-    # 仅筛选指定模块
-    if request.modules:
-        query = query.filter(models.Content.module.in_(request.modules))
-    # 可选：筛选子分类
-    if request.subcategories:
-        query = query.filter(models.Content.subcategory.in_(request.subcategories))
-
-    items: List[models.Content] = query.all()
-    updated = 0
-
-    for item in items:
-        # 使用同一生成器按原有三元组(module, subcategory, title)再生成
-        generated = content_generator.generate_content(item.module, item.subcategory, item.title)
-        # 覆盖更新关键字段
-        if "content_body" in generated:
-            item.content_body = generated["content_body"]
-        if "python_code" in generated:
-            item.python_code = generated["python_code"]
-        if "formulas" in generated:
-            item.formulas = generated["formulas"]
-        if "charts_data" in generated:
-            item.charts_data = generated["charts_data"]
-        if "tags" in generated:
-            item.tags = generated["tags"]
-        db.add(item)
-        updated += 1
-
-    if updated:
-        db.commit()
-
-    return {"status": "ok", "updated": updated}
\ No newline at end of file
+@jobs.handler("init_math")
+def _run_init_math(db: Session, ctx: jobs.JobContext, params: dict) -> dict:
+    created = populate_math_contents(db, get_content_generator(), batch_size=jobs.JOB_BATCH_SIZE, progress=ctx.report)
+    return {"created": created}
+
+
+@jobs.handler("init_ml")
+def _run_init_ml(db: Session, ctx: jobs.JobContext, params: dict) -> dict:
+    created = populate_ml_contents(db, get_content_generator(), batch_size=jobs.JOB_BATCH_SIZE, progress=ctx.report)
+    return {"created": created}
+
+
+@jobs.handler("update_content")
+def _run_update_content(db: Session, ctx: jobs.JobContext, params: dict) -> dict:
+    updated = regenerate_contents(
+        db,
+        get_content_generator(),
+        params.get("modules") or [],
+        params.get("subcategories"),
+        batch_size=jobs.JOB_BATCH_SIZE,
+        progress=ctx.report,
+    )
+    return {"updated": updated}
+
+
+@router.post("/content/init_math", response_model=schemas.JobSubmitted, status_code=202)
+def init_math_content():
+    """后台批量初始化数学内容，立即返回任务 id，进度见 /jobs/{job_id}"""
+    job = jobs.submit("init_math")
+    return {"status": job.status, "job_id": job.id}
+
+
+@router.post("/content/init_ml", response_model=schemas.JobSubmitted, status_code=202)
+def init_ml_content():
+    """后台批量初始化机器学习内容，立即返回任务 id，进度见 /jobs/{job_id}"""
+    job = jobs.submit("init_ml")
+    return {"status": job.status, "job_id": job.id}
+
+
+@router.post("/content/update/", response_model=schemas.JobSubmitted, status_code=202)
+def update_content(request: schemas.ContentUpdateRequest):
+    """后台根据模块/子类批量再生成内容并更新现有记录（用于结构变更或内容刷新），立即返回任务 id。"""
+    job = jobs.submit("update_content", request.model_dump())
+    return {"status": job.status, "job_id": job.id}
@@ -1,36 +1,51 @@
+import os
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app import schemas
+from app import jobs, schemas
+from app.importer import archive
 from app.importer.md_importer import import_markdown_text
 
 router = APIRouter()
 
 
+@jobs.handler("import_archive")
+def _run_import_archive(db: Session, ctx: jobs.JobContext, params: dict) -> dict:
+    return archive.import_archive(
+        db,
+        params["path"],
+        overwrite=params.get("overwrite", False),
+        batch_size=jobs.JOB_BATCH_SIZE,
+        progress=ctx.report,
+    )
+
+
 @router.post("/import-md/text")
 def import_md_from_text(req: schemas.ImportMdTextRequest, db: Session = Depends(get_db)):
     status, obj = import_markdown_text(db, req.md_text, base_dir=req.base_dir, overwrite=req.overwrite)
     return {"status": status, "id": getattr(obj, "id", None), "title": getattr(obj, "title", None)}
 
 
+# 上传文件由 Starlette 暂存在 SpooledTemporaryFile 中；同步处理函数在线程池执行，
+# 读取与导入（含数据库写入）都不会阻塞事件循环
 @router.post("/import-md/file")
-async def import_md_from_file(
+def import_md_from_file(
     db: Session = Depends(get_db),
     file: UploadFile = File(...),
     overwrite: bool = Form(False),
     base_dir: Optional[str] = Form(None),
 ):
-    data = await file.read()
-    text = data.decode("utf-8", errors="ignore")
+    text = file.file.read().decode("utf-8", errors="ignore")
     status, obj = import_markdown_text(db, text, base_dir=base_dir, overwrite=overwrite)
     return {"status": status, "id": getattr(obj, "id", None), "title": getattr(obj, "title", None)}
 
 
 @router.post("/import-md/files")
-async def import_md_from_files(
+def import_md_from_files(
     db: Session = Depends(get_db),
     files: List[UploadFile] = File(...),
     overwrite: bool = Form(False),
@@ -38,8 +53,7 @@ async def import_md_from_files(
 ):
     results: List[dict] = []
     for f in files:
-        data = await f.read()
-        text = data.decode("utf-8", errors="ignore")
+        text = f.file.read().decode("utf-8", errors="ignore")
         status, obj = import_markdown_text(db, text, base_dir=base_dir, overwrite=overwrite)
         results.append({
             "file": f.filename,
@@ -47,4 +61,29 @@ async def import_md_from_files(
             "id": getattr(obj, "id", None),
             "title": getattr(obj, "title", None),
         })
-    return {"results": results}
\ No newline at end of file
+    return {"results": results}
+
+
+@router.post("/import-md/archive", response_model=schemas.JobSubmitted, status_code=202)
+async def import_md_from_archive(
+    file: UploadFile = File(...),
+    overwrite: bool = Form(False),
+):
+    """上传 zip/tar(.gz) 格式的 Markdown + 图片压缩包：分块写入磁盘后由后台任务解压导入，
+    立即返回任务 id，进度见 /jobs/{job_id}"""
+    path = archive.new_upload_path(file.filename)
+    try:
+        size = 0
+        with open(path, "wb") as out:
+            while chunk := await file.read(archive.COPY_CHUNK_SIZE):
+                size += len(chunk)
+                if size > archive.MAX_ARCHIVE_BYTES:
+                    raise HTTPException(status_code=413, detail="压缩包过大")
+                await run_in_threadpool(out.write, chunk)
+        if not await run_in_threadpool(archive.is_archive, path):
+            raise HTTPException(status_code=400, detail="仅支持 zip 或 tar 压缩包")
+        job = await run_in_threadpool(jobs.submit, "import_archive", {"path": path, "overwrite": overwrite, "filename": file.filename})
+    except BaseException:
+        os.remove(path)
+        raise
+    return {"status": job.status, "job_id": job.id}
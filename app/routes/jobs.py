@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.database import get_db
+from app import schemas, jobs
+
+router = APIRouter()
+
+
+@router.get("/jobs/", response_model=List[schemas.JobOut])
+def list_jobs(
+    kind: Optional[str] = Query(None, description="任务类型过滤"),
+    limit: int = 20,
+    db: Session = Depends(get_db),
+):
+    return jobs.list_jobs(db, kind=kind, limit=limit)
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.JobOut)
+def read_job(job_id: int, db: Session = Depends(get_db)):
+    job = jobs.get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务未找到")
+    return job
@@ -1,37 +1,41 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from app.database import get_db
-from app import models, schemas
+from app.database import get_async_db
+from app import schemas, crud_async, search_index
+from app.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
 
 @router.get("/search/", response_model=schemas.SearchResults)
-def search_content(
+async def search_content(
     query: str = Query(..., description="搜索关键词"),
     module: Optional[str] = Query(None, description="模块过滤"),
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor；提供时忽略 skip"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    search_conditions = [
-        models.Content.title.ilike(f"%{query}%"),
-        models.Content.content_body.ilike(f"%{query}%"),
-        models.Content.python_code.ilike(f"%{query}%"),
-    ]
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, search_index.CURSOR_TYPES)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="无效的分页游标")
 
-    if module:
-        query_obj = db.query(models.Content).filter(
-            models.Content.module == module,
-            or_(*search_conditions),
+    hits, total_count, next_key = await crud_async.search(db, query, module=module, skip=skip, limit=limit, after=after)
+    results = [
+        schemas.SearchResult(
+            **schemas.Content.model_validate(obj).model_dump(),
+            score=score,
+            snippet=snippet,
         )
-    else:
-        query_obj = db.query(models.Content).filter(or_(*search_conditions))
-
-    total_count = query_obj.count()
-    results = query_obj.offset(skip).limit(limit).all()
-
-    return schemas.SearchResults(results=results, total_count=total_count)
\ No newline at end of file
+        for obj, score, snippet in hits
+    ]
+    return schemas.SearchResults(
+        results=results,
+        total_count=total_count,
+        next_cursor=encode_cursor(next_key) if next_key else None,
+    )
@@ -1,14 +1,49 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
+from typing import Optional
 import os
 
+from app import assets, image_variants
+from app.content_cache import content_cache
+
 router = APIRouter()
 
+# 资源按内容寻址，内容不变则 URL 不变，可长期缓存
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
 
 @router.get("/chart/{chart_id}")
-async def get_chart_image(chart_id: str):
+async def get_chart_image(
+    chart_id: str,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=4096, description="需要的像素宽度（设备像素），返回不小于它的最窄变体"),
+):
+    """图表资源；客户端 Accept 含 image/webp 时返回 WebP，带 w= 时返回缩放后的变体"""
+    found = assets.find_asset(chart_id)
+    if found:
+        path, media_type = found
+        variant = await run_in_threadpool(
+            image_variants.select, chart_id, os.path.splitext(path)[1].lstrip("."), request.headers.get("accept", ""), w
+        )
+        tag = chart_id
+        if variant:
+            path, media_type, variant_id = variant
+            tag = f"{chart_id}-{variant_id}"
+        etag = f'"{tag}"'
+        headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL, "Vary": "Accept"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        return FileResponse(path, media_type=media_type, headers=headers)
+
     chart_path = f"app/static/images/{chart_id}.png"
     if os.path.exists(chart_path):
         return FileResponse(chart_path)
     else:
-        raise HTTPException(status_code=404, detail="图表未找到")
\ No newline at end of file
+        raise HTTPException(status_code=404, detail="图表未找到")
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """内容读缓存的命中/未命中等指标"""
+    return content_cache.metrics()
@@ -35,6 +35,19 @@ class Content(BaseModel):
         from_attributes = True
 
 
+class ContentSummary(BaseModel):
+    """列表页使用的轻量投影，不含正文/代码/公式/图表"""
+    id: int
+    module: str
+    subcategory: str
+    title: str
+    tags: Optional[List[str]] = None
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class SearchQuery(BaseModel):
     query: str
     module: Optional[str] = None
@@ -42,9 +55,15 @@ class SearchQuery(BaseModel):
     offset: int = 0
 
 
+class SearchResult(Content):
+    score: Optional[float] = None
+    snippet: Optional[str] = None
+
+
 class SearchResults(BaseModel):
-    results: List[Content]
+    results: List[SearchResult]
     total_count: int
+    next_cursor: Optional[str] = None
 
 
 class ContentUpdateRequest(BaseModel):
@@ -61,4 +80,26 @@ class GenerateRequest(BaseModel):
 class ImportMdTextRequest(BaseModel):
     md_text: str
     overwrite: bool = False
-    base_dir: Optional[str] = None
\ No newline at end of file
+    base_dir: Optional[str] = None
+
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: str
+    params: Optional[Dict[str, Any]] = None
+    progress: int = 0
+    total: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class JobSubmitted(BaseModel):
+    status: str = "queued"
+    job_id: int
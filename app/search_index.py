@@ -0,0 +1,287 @@
+"""
+内容全文索引（SQLite FTS5）。
+
+- 倒排索引表 content_fts 以 content.id 作为 rowid，索引 title/content_body/python_code，
+  module 作为不参与分词的过滤列。
+- 中文按单字切分（写入前在 CJK 字符两侧插入空格），查询时将每个关键词转为短语查询，
+  等价于子串匹配，因此 "向量" 这类双字词也能命中。
+- 通过 ORM 事件在 create/update/import 时自动同步，非 SQLite 数据库回退为 ILIKE 扫描。
+"""
+import html
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event, inspect, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app import models
+
+FTS_TABLE = "content_fts"
+# search() 的 next_key (rank, id) 中各元素的类型（见 pagination.decode_cursor）
+CURSOR_TYPES = ((int, float), int)
+
+# BM25 列权重：标题 > 正文 > 代码（module 列不参与打分）
+_BM25_WEIGHTS = (10.0, 2.0, 1.0, 0.0)
+_INDEXED_FIELDS = ("title", "content_body", "python_code", "module")
+
+_CJK_RE = re.compile(
+    r"([\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff])"
+)
+# 与 unicode61 分词器一致：字母/数字为词元，其余（含下划线）为分隔符
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+# id(engine) -> 索引是否可用，每个引擎只检测一次
+_ready: Dict[int, bool] = {}
+
+
+def segment(value: Optional[str]) -> str:
+    """在 CJK 字符两侧插入空格，使 unicode61 分词器按单字切分。"""
+    if not value:
+        return ""
+    return _CJK_RE.sub(r" \1 ", value)
+
+
+def build_match_query(query: str) -> str:
+    """将用户输入转为 FTS5 MATCH 表达式：每个关键词为一个前缀短语，多个关键词取交集。"""
+    phrases: List[str] = []
+    for term in query.split():
+        tokens = _TOKEN_RE.findall(segment(term))
+        if tokens:
+            phrases.append('"' + " ".join(tokens) + '"*')
+    return " AND ".join(phrases)
+
+
+def _is_sqlite(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def ensure_index(bind) -> bool:
+    """确保索引表存在；首次创建或与主表行数不一致时全量重建。返回索引是否可用。"""
+    engine = getattr(bind, "engine", bind)
+    key = id(engine)
+    if key in _ready:
+        return _ready[key]
+    if not _is_sqlite(bind):
+        _ready[key] = False
+        return False
+
+    def _setup(conn) -> bool:
+        try:
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "title, content_body, python_code, module UNINDEXED, tokenize='unicode61')"
+            ))
+        except Exception:
+            # SQLite 未编译 FTS5 时回退为 ILIKE
+            return False
+        indexed = conn.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar()
+        total = conn.execute(text("SELECT count(*) FROM content")).scalar()
+        if indexed != total:
+            rebuild_index(conn)
+        return True
+
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            ok = _setup(conn)
+    else:
+        ok = _setup(bind)
+    _ready[key] = ok
+    return ok
+
+
+def rebuild_index(conn) -> int:
+    """清空并按 content 表全量重建索引，返回写入行数。"""
+    conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    rows = conn.execute(
+        text("SELECT id, title, content_body, python_code, module FROM content")
+    ).fetchall()
+    if rows:
+        conn.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE}(rowid, title, content_body, python_code, module) "
+                "VALUES (:id, :title, :content_body, :python_code, :module)"
+            ),
+            [_index_params(r.id, r.title, r.content_body, r.python_code, r.module) for r in rows],
+        )
+    return len(rows)
+
+
+def _index_params(content_id, title, content_body, python_code, module) -> dict:
+    return {
+        "id": content_id,
+        "title": segment(title),
+        "content_body": segment(content_body),
+        "python_code": segment(python_code),
+        "module": module or "",
+    }
+
+
+def index_row(conn, target: models.Content) -> None:
+    if not ensure_index(conn):
+        return
+    conn.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": target.id})
+    conn.execute(
+        text(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, content_body, python_code, module) "
+            "VALUES (:id, :title, :content_body, :python_code, :module)"
+        ),
+        _index_params(target.id, target.title, target.content_body, target.python_code, target.module),
+    )
+
+
+def reindex_rows(conn, content_ids: Sequence[int]) -> None:
+    """按 id 从 content 表重建索引行（用于绕过 ORM 事件的批量写入）"""
+    if not content_ids or not ensure_index(conn):
+        return
+    for start in range(0, len(content_ids), 500):
+        chunk = list(content_ids[start:start + 500])
+        params = {f"id{i}": cid for i, cid in enumerate(chunk)}
+        placeholders = ", ".join(f":id{i}" for i in range(len(chunk)))
+        conn.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})"), params)
+        rows = conn.execute(
+            text(f"SELECT id, title, content_body, python_code, module FROM content WHERE id IN ({placeholders})"),
+            params,
+        ).fetchall()
+        if rows:
+            conn.execute(
+                text(
+                    f"INSERT INTO {FTS_TABLE}(rowid, title, content_body, python_code, module) "
+                    "VALUES (:id, :title, :content_body, :python_code, :module)"
+                ),
+                [_index_params(r.id, r.title, r.content_body, r.python_code, r.module) for r in rows],
+            )
+
+
+def unindex_row(conn, content_id: int) -> None:
+    if not ensure_index(conn):
+        return
+    conn.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": content_id})
+
+
+@event.listens_for(models.Content, "after_insert")
+def _content_after_insert(mapper, connection, target):
+    index_row(connection, target)
+
+
+@event.listens_for(models.Content, "after_update")
+def _content_after_update(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[f].history.has_changes() for f in _INDEXED_FIELDS):
+        index_row(connection, target)
+
+
+@event.listens_for(models.Content, "after_delete")
+def _content_after_delete(mapper, connection, target):
+    unindex_row(connection, target.id)
+
+
+# ---------------- 查询 ----------------
+
+def make_snippet(value: Optional[str], terms: List[str], width: int = 80) -> Optional[str]:
+    """截取首个命中位置附近的文本并用 <mark> 高亮关键词（已做 HTML 转义）。"""
+    if not value or not terms:
+        return None
+    lowered = value.lower()
+    hits = [(lowered.find(t.lower()), t) for t in terms]
+    hits = [(pos, t) for pos, t in hits if pos >= 0]
+    if not hits:
+        return None
+    first = min(pos for pos, _ in hits)
+    start = max(0, first - width // 4)
+    end = min(len(value), start + width)
+    fragment = html.escape(value[start:end])
+    pattern = re.compile("|".join(re.escape(html.escape(t)) for t in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    fragment = pattern.sub(lambda m: f"<mark>{m.group(0)}</mark>", fragment)
+    return ("…" if start > 0 else "") + fragment + ("…" if end < len(value) else "")
+
+
+def _snippet_for(obj: models.Content, terms: List[str]) -> Optional[str]:
+    return (
+        make_snippet(obj.content_body, terms)
+        or make_snippet(obj.title, terms)
+        or make_snippet(obj.python_code, terms)
+    )
+
+
+def search(
+    db: Session,
+    query: str,
+    module: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 10,
+    after: Optional[Sequence[Any]] = None,
+) -> Tuple[List[Tuple[models.Content, Optional[float], Optional[str]]], int, Optional[List[Any]]]:
+    """全文检索，返回 ([(content, score, snippet)], total_count, next_key)。
+
+    score 越大越相关；结果按 (rank, id) 排序，after 为上一页返回的 next_key（提供时忽略 skip），
+    未满页时 next_key 为 None。
+    """
+    terms = query.split()
+    if not ensure_index(db.get_bind()):
+        return _search_fallback(db, query, module, skip, limit, terms, after)
+
+    match = build_match_query(query)
+    if not match:
+        return [], 0, None
+
+    where = f"{FTS_TABLE} MATCH :match"
+    params: Dict[str, Any] = {"match": match}
+    if module:
+        where += " AND module = :module"
+        params["module"] = module
+
+    total_count = db.execute(
+        text(f"SELECT count(*) FROM {FTS_TABLE} WHERE {where}"), params
+    ).scalar() or 0
+    if total_count == 0:
+        return [], 0, None
+
+    weights = ", ".join(str(w) for w in _BM25_WEIGHTS)
+    ranked_sql = f"SELECT rowid AS id, bm25({FTS_TABLE}, {weights}) AS rank FROM {FTS_TABLE} WHERE {where}"
+    page_params = {**params, "limit": limit}
+    if after is not None:
+        sql = (
+            f"SELECT id, rank FROM ({ranked_sql}) "
+            "WHERE rank > :after_rank OR (rank = :after_rank AND id > :after_id) "
+            "ORDER BY rank, id LIMIT :limit"
+        )
+        page_params.update(after_rank=after[0], after_id=after[1])
+    else:
+        sql = f"{ranked_sql} ORDER BY rank, rowid LIMIT :limit OFFSET :skip"
+        page_params["skip"] = skip
+    ranked = db.execute(text(sql), page_params).fetchall()
+
+    ids = [r.id for r in ranked]
+    objs = {
+        c.id: c
+        for c in db.query(models.Content).filter(models.Content.id.in_(ids)).all()
+    } if ids else {}
+    results = []
+    for r in ranked:
+        obj = objs.get(r.id)
+        if obj is not None:
+            # bm25() 返回负值，取反后越大越相关
+            results.append((obj, -r.rank, _snippet_for(obj, terms)))
+    next_key = [ranked[-1].rank, ranked[-1].id] if len(ranked) == limit else None
+    return results, total_count, next_key
+
+
+def _search_fallback(db: Session, query: str, module: Optional[str], skip: int, limit: int, terms: List[str], after: Optional[Sequence[Any]] = None):
+    """非 SQLite 环境的 ILIKE 检索，按 id 排序；游标沿用 (rank, id) 形式，rank 恒为 0。"""
+    search_conditions = [
+        models.Content.title.ilike(f"%{query}%"),
+        models.Content.content_body.ilike(f"%{query}%"),
+        models.Content.python_code.ilike(f"%{query}%"),
+    ]
+    query_obj = db.query(models.Content).filter(or_(*search_conditions))
+    if module:
+        query_obj = query_obj.filter(models.Content.module == module)
+    total_count = query_obj.count()
+    query_obj = query_obj.order_by(models.Content.id)
+    if after is not None:
+        rows = query_obj.filter(models.Content.id > after[1]).limit(limit).all()
+    else:
+        rows = query_obj.offset(skip).limit(limit).all()
+    next_key = [0.0, rows[-1].id] if len(rows) == limit else None
+    return [(obj, None, _snippet_for(obj, terms)) for obj in rows], total_count, next_key
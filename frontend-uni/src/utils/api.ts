@@ -70,27 +70,44 @@ async function authRequest<T>(path: string, init?: RequestInit): Promise<T> {
   }
 }
 
+type ListParams = { module?: string; subcategory?: string; skip?: number; limit?: number; view?: 'full' | 'summary'; fields?: string[]; cursor?: string }
+
+function listQuery(params?: ListParams) {
+  const q: string[] = []
+  if (params?.module) q.push(`module=${encodeURIComponent(params.module)}`)
+  if (params?.subcategory) q.push(`subcategory=${encodeURIComponent(params.subcategory)}`)
+  if (typeof params?.skip === 'number') q.push(`skip=${params.skip}`)
+  if (typeof params?.limit === 'number') q.push(`limit=${params.limit}`)
+  if (params?.view) q.push(`view=${params.view}`)
+  if (params?.fields?.length) q.push(`fields=${encodeURIComponent(params.fields.join(','))}`)
+  if (params?.cursor) q.push(`cursor=${encodeURIComponent(params.cursor)}`)
+  return q.length ? `?${q.join('&')}` : ''
+}
+
 export const api = {
   base: API_BASE,
   // content
-  listContents(params?: { module?: string; subcategory?: string; skip?: number; limit?: number }) {
-    const q: string[] = []
-    if (params?.module) q.push(`module=${encodeURIComponent(params.module)}`)
-    if (params?.subcategory) q.push(`subcategory=${encodeURIComponent(params.subcategory)}`)
-    if (typeof params?.skip === 'number') q.push(`skip=${params.skip}`)
-    if (typeof params?.limit === 'number') q.push(`limit=${params.limit}`)
-    const qs = q.length ? `?${q.join('&')}` : ''
-    return rawRequest<ContentItem[]>(`/content/${qs}`)
+  // view=summary / fields 仅返回列表所需字段，避免下载正文与图表
+  listContents(params?: ListParams) {
+    return rawRequest<ContentItem[]>(`/content/${listQuery(params)}`)
+  },
+  // keyset 分页：返回下一页游标（响应头 X-Next-Cursor，末页为空串）
+  async listContentsPage(params?: ListParams) {
+    const res = await fetch(`${API_BASE}/content/${listQuery(params)}`)
+    if (!res.ok) throw new Error(await res.text().catch(() => `HTTP ${res.status}`))
+    const items = await res.json() as ContentItem[]
+    return { items, nextCursor: res.headers.get('X-Next-Cursor') || '' }
   },
   getContentById(id: number) {
     return rawRequest<ContentItem>(`/content/${id}`)
   },
-  search(params: { query: string; module?: string; skip?: number; limit?: number }) {
+  search(params: { query: string; module?: string; skip?: number; limit?: number; cursor?: string }) {
     const q: string[] = [`query=${encodeURIComponent(params.query)}`]
     if (params.module) q.push(`module=${encodeURIComponent(params.module)}`)
     if (typeof params.skip === 'number') q.push(`skip=${params.skip}`)
     if (typeof params.limit === 'number') q.push(`limit=${params.limit}`)
-    return rawRequest<{ results: ContentItem[]; total_count: number }>(`/search/?${q.join('&')}`)
+    if (params.cursor) q.push(`cursor=${encodeURIComponent(params.cursor)}`)
+    return rawRequest<{ results: (ContentItem & { score?: number; snippet?: string })[]; total_count: number; next_cursor?: string | null }>(`/search/?${q.join('&')}`)
   },
   // auth
   async register(username: string, email: string, password: string) {
@@ -186,16 +186,40 @@ function renderCharts(charts) {
         cap.style.marginBottom = '6px';
         cap.textContent = name;
 
+        card.appendChild(cap);
+        el.appendChild(card);
+
+        if (imgBase64 && typeof imgBase64 === 'object' && imgBase64.type === 'echarts') {
+            // 图表描述：{ type: 'echarts', format: 'spec', ...ECharts option }，没有 url
+            const { type, format, ...option } = imgBase64;
+            const box = document.createElement('div');
+            box.style.width = '360px';
+            box.style.height = '270px';
+            card.appendChild(box);
+            if (window.echarts) {
+                window.echarts.init(box).setOption(option);
+            } else {
+                box.style.display = 'flex';
+                box.style.alignItems = 'center';
+                box.style.justifyContent = 'center';
+                box.style.color = '#7f8c8d';
+                box.textContent = 'ECharts 未加载，无法显示该图表';
+            }
+            return;
+        }
+
         const img = document.createElement('img');
         img.style.maxWidth = '360px';
         img.style.height = 'auto';
-        // charts_data 里是纯 base64（不带 data:image/png;base64, 前缀），因此需要补齐
-        img.src = imgBase64.startsWith('data:') ? imgBase64 : `data:image/png;base64,${imgBase64}`;
+        if (imgBase64 && typeof imgBase64 === 'object' && imgBase64.url) {
+            // 资源存储引用：{ type: 'image', format, hash, url }
+            img.src = new URL(imgBase64.url, 'http://127.0.0.1:8001').href;
+        } else if (typeof imgBase64 === 'string') {
+            // 旧数据：charts_data 里是纯 base64（不带 data:image/png;base64, 前缀），因此需要补齐
+            img.src = imgBase64.startsWith('data:') ? imgBase64 : `data:image/png;base64,${imgBase64}`;
+        }
         img.alt = name;
-
-        card.appendChild(cap);
         card.appendChild(img);
-        el.appendChild(card);
     });
 }
 
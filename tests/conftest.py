@@ -0,0 +1,32 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# 测试使用临时 SQLite 库，必须在导入 app 之前设置
+_DB_DIR = tempfile.mkdtemp(prefix="ml_learning_test_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import models  # noqa: E402
+from app.database import Base, SessionLocal, engine, ensure_schema  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    Base.metadata.create_all(bind=engine)
+    ensure_schema()
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.query(models.Content).delete()
+        session.commit()
+        session.close()
@@ -0,0 +1,18 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app import database
+
+
+def test_ensure_schema_adds_missing_columns(tmp_path, monkeypatch):
+    old = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with old.begin() as conn:
+        conn.execute(text("CREATE TABLE content (id INTEGER PRIMARY KEY, module VARCHAR(100), subcategory VARCHAR(100), updated_at DATETIME)"))
+        conn.execute(text("CREATE TABLE jobs (id INTEGER PRIMARY KEY, kind VARCHAR(50))"))
+    monkeypatch.setattr(database, "engine", old)
+
+    database.ensure_schema()
+    database.ensure_schema()
+
+    columns = {c["name"]: c["type"] for c in inspect(old).get_columns("jobs")}
+    assert str(columns["heartbeat_at"]) == "DATETIME"
+    assert "source_hash" in {c["name"] for c in inspect(old).get_columns("content")}
@@ -0,0 +1,26 @@
+import os
+
+from app.importer import cli
+from app.importer.manifest import MANIFEST_NAME
+
+
+def test_file_with_dir_watch_passes_manifest(tmp_path, monkeypatch):
+    md = tmp_path / "a.md"
+    md.write_text("# 测试标题\n\n正文\n", encoding="utf-8")
+    watched = tmp_path / "notes"
+    watched.mkdir()
+    calls = []
+    monkeypatch.setattr(cli, "_watch", lambda args, manifest_path: calls.append(manifest_path))
+
+    cli.main(["--file", str(md), "--dir", str(watched), "--watch"])
+
+    assert calls == [os.path.join(str(watched), MANIFEST_NAME)]
+
+
+def test_no_manifest_with_watch(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(cli, "_watch", lambda args, manifest_path: calls.append(manifest_path))
+
+    cli.main(["--dir", str(tmp_path), "--watch", "--no-manifest"])
+
+    assert calls == [None]
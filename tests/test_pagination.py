@@ -0,0 +1,30 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import crud, search_index
+from app.main import app
+from app.pagination import decode_cursor, encode_cursor
+
+
+def test_decode_cursor_round_trip():
+    assert decode_cursor(encode_cursor(["math", "代数", 7]), crud.LIST_CURSOR_TYPES) == ["math", "代数", 7]
+    assert decode_cursor(encode_cursor([-1.5, 3]), search_index.CURSOR_TYPES) == [-1.5, 3]
+
+
+@pytest.mark.parametrize("values", [[{}, [], 1], ["math", "代数", "7"], ["math", None, 1], ["math", "代数", True], ["math", "代数"]])
+def test_decode_cursor_rejects_malformed_list_cursor(values):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(values), crud.LIST_CURSOR_TYPES)
+
+
+@pytest.mark.parametrize("values", [["1", 2], [1.0, 2.5], [{}, 1]])
+def test_decode_cursor_rejects_malformed_search_cursor(values):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(values), search_index.CURSOR_TYPES)
+
+
+def test_type_malformed_cursor_returns_400():
+    client = TestClient(app)
+    cursor = encode_cursor([{}, [], 1])
+    assert client.get("/api/v1/content/", params={"cursor": cursor}).status_code == 400
+    assert client.get("/api/v1/search/", params={"query": "x", "cursor": cursor}).status_code == 400
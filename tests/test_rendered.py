@@ -0,0 +1,27 @@
+from app import crud, models, rendered
+
+
+def _content(i: int) -> dict:
+    return {
+        "module": "math",
+        "subcategory": "测试",
+        "title": f"渲染测试{i}",
+        "content_body": "body",
+        "python_code": "print(1)",
+        "tags": [],
+    }
+
+
+def test_rendered_updated_at_matches_each_row_in_multi_row_commit(db):
+    ids = [crud.create_content(db, _content(i)).id for i in range(3)]
+    objs = db.query(models.Content).filter(models.Content.id.in_(ids)).all()
+    for i, obj in enumerate(objs):
+        obj.tags = [f"tag{i}"]
+    db.commit()
+
+    content = dict(db.query(models.Content.id, models.Content.updated_at).filter(models.Content.id.in_(ids)).all())
+    stored = dict(db.execute(
+        rendered.RENDERED.select().with_only_columns(rendered.RENDERED.c.content_id, rendered.RENDERED.c.updated_at)
+        .where(rendered.RENDERED.c.content_id.in_(ids))
+    ).all())
+    assert stored == content